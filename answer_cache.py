@@ -0,0 +1,188 @@
+import os
+import re
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from tracing import traced
+
+DIM = 2048
+SIMILARITY_THRESHOLD = float(os.environ.get("PATHPLANNER_ANSWER_CACHE_THRESHOLD", "0.9"))
+MAX_ENTRIES = int(os.environ.get("PATHPLANNER_ANSWER_CACHE_MAX", "512"))
+MAX_ANSWER_BYTES = int(os.environ.get("PATHPLANNER_ANSWER_CACHE_BYTES", str(4 * 1024 * 1024)))
+WORD_WEIGHT = 1.0
+TRIGRAM_WEIGHT = 0.35
+
+# Words that change how a question is phrased, not what it asks
+FILLER = {
+    "what", "whats", "is", "are", "was", "the", "a", "an", "of", "explain", "describe", "define", "tell",
+    "me", "about", "please", "can", "could", "you", "would", "how", "does", "do", "give", "i", "want",
+    "to", "know", "understand", "meaning", "definition", "in", "simple", "terms", "briefly", "mean",
+}
+
+
+def normalize_query(text):
+    text = str(text).lower().replace("’", "'")
+    text = re.sub(r"'s\b", "", text)
+    words = re.findall(r"[a-z]+|\d+", text)
+    return [w for w in words if w not in FILLER] or words
+
+
+# Numbers and math operators, in order. Two questions only share an answer when these are
+# identical: "x^2 + 5x + 6 = 0" and "... + 7 = 0" differ in one token but need different answers.
+# A hyphen inside a word ("k-means") is not a minus sign.
+MATH_TOKEN = re.compile(r"\d+(?:\.\d+)?|[+*/^=<>%√π×÷]|-(?![a-z])|(?<![a-z])-")
+
+
+def exact_key(text):
+    tokens = MATH_TOKEN.findall(str(text).lower())
+    return zlib.crc32(" ".join(tokens).encode("utf-8"))
+
+
+def _bucket(feature):
+    h = zlib.crc32(feature.encode("utf-8"))
+    # One bit of the hash picks the sign so collisions cancel out instead of piling up
+    return h % DIM, 1.0 if h & 0x80000000 else -1.0
+
+
+# 🔢 Hashed word + in-word trigram features, L2-normalized (computed locally, no model)
+def vectorize(text):
+    vec = np.zeros(DIM, dtype=np.float32)
+    for word in normalize_query(text):
+        i, sign = _bucket("w:" + word)
+        vec[i] += sign * WORD_WEIGHT
+        padded = f"<{word}>"
+        for j in range(len(padded) - 2):
+            i, sign = _bucket("c:" + padded[j:j + 3])
+            vec[i] += sign * TRIGRAM_WEIGHT
+    norm = np.linalg.norm(vec)
+    return vec / norm if norm else vec
+
+
+# 🧠 Near-duplicate question cache: one matrix product against every stored question,
+# a fixed-size vector table, LRU eviction by entry count and by total answer size
+class AnswerCache:
+    def __init__(self, max_entries=MAX_ENTRIES, threshold=SIMILARITY_THRESHOLD, max_answer_bytes=MAX_ANSWER_BYTES):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.max_answer_bytes = max_answer_bytes
+        self._lock = threading.Lock()
+        self.vectors = np.zeros((max_entries, DIM), dtype=np.float32)
+        self.exact_keys = np.zeros(max_entries, dtype=np.int64)
+        self.last_used = np.zeros(max_entries, dtype=np.int64)
+        self.used = np.zeros(max_entries, dtype=bool)
+        self.entries = [None] * max_entries
+        self.answer_bytes = 0
+        self._clock = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _tick(self):
+        self._clock += 1
+        return self._clock
+
+    def _best(self, vec, key):
+        if not self.used.any():
+            return None, 0.0
+        sims = self.vectors @ vec
+        sims[~self.used | (self.exact_keys != key)] = -1.0
+        slot = int(np.argmax(sims))
+        return slot, float(sims[slot])
+
+    @traced("answer_cache.lookup")
+    def lookup(self, query):
+        vec, key = vectorize(query), exact_key(query)
+        with self._lock:
+            slot, score = self._best(vec, key)
+            if slot is None or score < self.threshold:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.last_used[slot] = self._tick()
+            entry = self.entries[slot]
+            entry["hits"] += 1
+            return {"answer": entry["answer"], "similarity": round(score, 3), "matched": entry["query"]}
+
+    def put(self, query, answer):
+        if not answer:
+            return
+        size = len(answer.encode("utf-8"))
+        if size > self.max_answer_bytes:
+            return
+        vec, key = vectorize(query), exact_key(query)
+        with self._lock:
+            slot, score = self._best(vec, key)
+            if slot is None or score < self.threshold:
+                free = np.flatnonzero(~self.used)
+                slot = int(free[0]) if len(free) else self._evict_lru()
+            else:
+                self._drop(slot)
+            while self.answer_bytes + size > self.max_answer_bytes:
+                self._evict_lru()
+            self.vectors[slot] = vec
+            self.exact_keys[slot] = key
+            self.used[slot] = True
+            self.last_used[slot] = self._tick()
+            self.entries[slot] = {"query": query, "answer": answer, "bytes": size, "hits": 0, "stored_at": time.time()}
+            self.answer_bytes += size
+
+    def _drop(self, slot):
+        self.answer_bytes -= self.entries[slot]["bytes"]
+        self.entries[slot] = None
+        self.used[slot] = False
+
+    def _evict_lru(self):
+        ages = np.where(self.used, self.last_used, np.iinfo(np.int64).max)
+        slot = int(np.argmin(ages))
+        self._drop(slot)
+        self.evictions += 1
+        return slot
+
+    def clear(self):
+        with self._lock:
+            self.used[:] = False
+            self.entries = [None] * self.max_entries
+            self.answer_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(self.used.sum()),
+                "max_entries": self.max_entries,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "evictions": self.evictions,
+                "answer_kb": round(self.answer_bytes / 1024, 1),
+                "vector_kb": round(self.vectors.nbytes / 1024, 1),
+            }
+
+    # 📋 Stored questions for the admin view, most recently used first
+    def list_entries(self):
+        with self._lock:
+            slots = sorted(np.flatnonzero(self.used), key=lambda s: -self.last_used[s])
+            return [
+                {"question": self.entries[s]["query"], "hits": self.entries[s]["hits"],
+                 "answer_chars": len(self.entries[s]["answer"]),
+                 "age_min": round((time.time() - self.entries[s]["stored_at"]) / 60, 1)}
+                for s in slots
+            ]
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_answer_cache():
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = AnswerCache()
+        return _cache
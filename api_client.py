@@ -0,0 +1,167 @@
+import json
+import os
+import threading
+from urllib.parse import quote
+
+from llm_gateway import in_background
+from utils import ProgressIndex
+
+API_URL = os.environ.get("PATHPLANNER_API_URL", "")
+DEFAULT_TIMEOUT = float(os.environ.get("PATHPLANNER_API_TIMEOUT", "200"))
+
+
+# 🌐 Thin client for api_server; one pooled keep-alive session per process
+class PathPlannerClient:
+    def __init__(self, base_url=API_URL, timeout=DEFAULT_TIMEOUT):
+        import requests
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def _post(self, path, payload):
+        res = self.session.post(self.base_url + path, json=payload, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+    def _put(self, path, payload):
+        res = self.session.put(self.base_url + path, json=payload, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+    def _get(self, path):
+        res = self.session.get(self.base_url + path, timeout=self.timeout)
+        res.raise_for_status()
+        return res.json()
+
+    def health(self):
+        return self._get("/health")
+
+    def interpret_goal(self, user_goal, use_cache=True):
+        return self._post("/goal/interpret", {"goal": user_goal, "use_cache": use_cache})
+
+    def generate_roadmap(self, topics, weeks, user_goal=None, efforts=None, prereqs=None):
+        return self._post("/roadmap", {"topics": list(topics), "weeks": weeks, "goal": user_goal,
+                                       "efforts": efforts, "prereqs": prereqs})
+
+    # Prefetch calls keep their background priority in the server's gateway
+    def generate_topic_roadmap(self, topic, weeks, use_cache=True):
+        return self._post("/roadmap/topic", {"topic": topic, "weeks": weeks, "use_cache": use_cache,
+                                             "background": in_background()})
+
+    # Same shape as llm_utils.stream_topic_roadmap; the server answers in one piece
+    def stream_topic_roadmap(self, topic, weeks, use_cache=True):
+        yield from self.generate_topic_roadmap(topic, weeks, use_cache).items()
+
+    # Topics the user ticked for this goal's roadmap are dropped server-side
+    def replan(self, roadmap, weeks_left, user, goal, start_week=1, efforts=None, prereqs=None):
+        return self._post("/roadmap/replan", {"roadmap": roadmap, "weeks_left": weeks_left, "start_week": start_week,
+                                              "user": user, "goal": goal, "efforts": efforts, "prereqs": prereqs})
+
+    def fetch_youtube_links_batch(self, queries, deadline=15):
+        data = self._post("/resources/youtube", {"queries": list(queries), "deadline": deadline})
+        return [[(link["title"], link["url"]) for link in links] for links in data["results"]]
+
+    def _ask_lines(self, payload):
+        with self.session.post(self.base_url + "/ask", json=payload, timeout=self.timeout, stream=True) as res:
+            res.raise_for_status()
+            for line in res.iter_lines():
+                if line:
+                    yield json.loads(line)
+
+    def ask_ai_stream(self, query):
+        for line in self._ask_lines({"query": query}):
+            if line.get("content"):
+                yield line["content"]
+
+    def ask_ai(self, query):
+        return "".join(self.ask_ai_stream(query))
+
+    # 🔌 Drop-in LLMGateway backend: model calls made in this process are run by the server
+    def chat_backend(self, model, messages, stream=False, keep_alive=None, format=None, **kwargs):
+        payload = {"model": model, "messages": messages}
+        if keep_alive is not None:
+            payload["keep_alive"] = keep_alive
+        if format is not None:
+            payload["format"] = format
+        chunks = (
+            {"message": {"role": "assistant", "content": line.get("content", "")}, "done": bool(line.get("done")),
+             "prompt_eval_count": line.get("prompt_eval_count"), "eval_count": line.get("eval_count"),
+             "load_duration": line.get("load_duration")}
+            for line in self._ask_lines(payload)
+        )
+        if stream:
+            return chunks
+        text = ""
+        final = {}
+        for chunk in chunks:
+            text += chunk["message"]["content"]
+            if chunk["done"]:
+                final = chunk
+        return {**final, "model": model, "message": {"role": "assistant", "content": text}, "done": True}
+
+    def get_progress(self, user):
+        return self._get(f"/progress/{quote(user, safe='')}")
+
+    def progress_store(self, user):
+        with self._lock:
+            store = self._stores.get(user)
+            if store is None:
+                store = self._stores[user] = RemoteProgressStore(self, user)
+            return store
+
+
+# 📡 Same surface as UserProgressStore, backed by the API; writes go straight to the server
+class RemoteProgressStore:
+    def __init__(self, client, user):
+        self.client = client
+        self.user = user
+        self.data = {}
+        self.index = ProgressIndex()
+        self.refresh()
+
+    def refresh(self):
+        self.data = self.client.get_progress(self.user)["weeks"]
+        self.index = ProgressIndex.from_progress(self.data)
+
+    def get(self, week_key):
+        return self.data.get(week_key, {})
+
+    def ensure_week(self, week_key, topics):
+        week = self.data.setdefault(week_key, {})
+        missing = [t for t in topics if t not in week]
+        if not missing:
+            return
+        for topic in missing:
+            week[topic] = False
+            self.index.update(week_key, topic, None, False)
+        self.client._post(f"/progress/{quote(self.user, safe='')}/weeks", {"week_key": week_key, "topics": missing})
+
+    def set(self, week_key, topic, done):
+        week = self.data.setdefault(week_key, {})
+        old = week.get(topic)
+        if old == done:
+            return
+        week[topic] = done
+        self.index.update(week_key, topic, old, done)
+        self.client._put(f"/progress/{quote(self.user, safe='')}",
+                         {"week_key": week_key, "topic": topic, "done": done})
+
+    def flush(self):
+        pass
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client():
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = PathPlannerClient()
+            # Model calls made in this process (StudyBot, prefetch) go through the server too
+            from llm_gateway import LLMGateway, set_gateway
+            set_gateway(LLMGateway(backend=_client.chat_backend))
+        return _client
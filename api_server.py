@@ -0,0 +1,285 @@
+import argparse
+import asyncio
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager, nullcontext
+from functools import partial
+from typing import Any, Dict, List, Optional, Union
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+
+import tracing
+from roadmap_generator import generate_roadmap
+from llm_utils import MODEL, interpret_goal, generate_topic_roadmap, ask_ai_stream
+from goal_matcher import get_goal_matcher
+from llm_cache import get_cache
+from llm_gateway import GatewayTimeout, background, get_gateway
+from model_router import get_router, start_warmup
+from scheduler import ScheduleError, replan
+from resource_suggester import fetch_youtube_links_batch
+from user_progress import get_user_progress_store
+from study_session import KEEP_ALIVE
+
+API_WORKERS = int(os.environ.get("PATHPLANNER_API_WORKERS", "32"))
+KEEP_ALIVE_SECONDS = int(os.environ.get("PATHPLANNER_API_KEEP_ALIVE", "30"))
+# Longest plan a single request may ask for
+MAX_WEEKS = int(os.environ.get("PATHPLANNER_API_MAX_WEEKS", "52"))
+
+# Blocking work (model calls, scraping, file I/O) runs here so the event loop stays free
+executor = ThreadPoolExecutor(max_workers=API_WORKERS, thread_name_prefix="api")
+
+
+# 🔥 Models start loading as the server comes up, not on the first user's request
+@asynccontextmanager
+async def lifespan(app):
+    start_warmup()
+    yield
+
+
+app = FastAPI(title="PathPlanner.AI API", lifespan=lifespan)
+
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(executor, partial(fn, *args, **kwargs))
+
+
+# 📡 Drive a blocking generator from the worker pool, one item at a time
+async def stream_blocking(gen):
+    loop = asyncio.get_running_loop()
+    done = object()
+    try:
+        while True:
+            item = await loop.run_in_executor(executor, next, gen, done)
+            if item is done:
+                break
+            yield item
+    finally:
+        await loop.run_in_executor(executor, gen.close)
+
+
+def _ndjson(obj):
+    return json.dumps(obj) + "\n"
+
+
+@app.exception_handler(GatewayTimeout)
+async def _gateway_timeout(request: Request, exc: GatewayTimeout):
+    return JSONResponse(status_code=504, content={"detail": str(exc)})
+
+
+# Only errors about the request itself; any other ValueError is an internal failure (500)
+@app.exception_handler(ScheduleError)
+async def _bad_schedule(request: Request, exc: ScheduleError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+
+class GoalRequest(BaseModel):
+    goal: str
+    use_cache: bool = True
+
+
+class RoadmapRequest(BaseModel):
+    topics: List[str]
+    weeks: int = Field(ge=1, le=MAX_WEEKS)
+    goal: Optional[str] = None
+    efforts: Optional[Dict[str, float]] = None
+    prereqs: Optional[Dict[str, List[str]]] = None
+
+
+class TopicRoadmapRequest(BaseModel):
+    topic: str
+    weeks: int = Field(ge=1, le=MAX_WEEKS)
+    use_cache: bool = True
+    # Speculative (prefetch) call: served from the gateway's background lane
+    background: bool = False
+
+
+class ReplanRequest(BaseModel):
+    roadmap: Dict[str, List[str]]
+    weeks_left: int = Field(ge=1, le=MAX_WEEKS)
+    start_week: int = Field(default=1, ge=1)
+    # Topics to drop; with user and goal, whatever that user has ticked for this roadmap too
+    done: List[str] = []
+    user: Optional[str] = None
+    goal: Optional[str] = None
+    efforts: Optional[Dict[str, float]] = None
+    prereqs: Optional[Dict[str, List[str]]] = None
+
+
+class LinksRequest(BaseModel):
+    queries: List[str]
+    deadline: float = 15
+
+
+class AskRequest(BaseModel):
+    query: Optional[str] = None
+    # A full chat history (as built by ChatSession) instead of a single question
+    messages: Optional[List[Dict[str, str]]] = None
+    # Only models the router serves; the API is not a general Ollama proxy
+    model: str = MODEL
+    # Seconds, or a duration with a unit such as "30m"
+    keep_alive: Union[int, float, str] = KEEP_ALIVE
+    # "json" or a JSON schema the reply must follow
+    format: Optional[Union[str, Dict[str, Any]]] = None
+
+
+class WeekRequest(BaseModel):
+    week_key: str
+    topics: List[str]
+
+
+class ProgressUpdate(BaseModel):
+    week_key: str
+    topic: str
+    done: bool
+
+
+@app.get("/health")
+async def health():
+    return {
+        "status": "ok",
+        "gateway": get_gateway().stats(),
+        "router": get_router().stats(),
+        "cache": get_cache().stats(),
+        "goal_matcher": get_goal_matcher().stats(),
+    }
+
+
+@app.post("/goal/interpret")
+async def api_interpret_goal(req: GoalRequest):
+    return await run_blocking(interpret_goal, req.goal, use_cache=req.use_cache)
+
+
+@app.post("/roadmap")
+async def api_generate_roadmap(req: RoadmapRequest):
+    return await run_blocking(generate_roadmap, req.topics, req.weeks, req.goal, req.efforts, req.prereqs)
+
+
+def _topic_roadmap(req):
+    with background() if req.background else nullcontext():
+        return generate_topic_roadmap(req.topic, req.weeks, use_cache=req.use_cache)
+
+
+@app.post("/roadmap/topic")
+async def api_generate_topic_roadmap(req: TopicRoadmapRequest):
+    return await run_blocking(_topic_roadmap, req)
+
+
+def _replan(req):
+    done = set(req.done)
+    if req.user is not None and req.goal is not None:
+        store = get_user_progress_store(req.user)
+        store.refresh()
+        for week in req.roadmap:
+            done.update(topic for topic, checked in store.get(f"{req.goal}_{week}").items() if checked)
+    return replan(req.roadmap, done, req.weeks_left, req.efforts, req.prereqs, start_week=req.start_week)
+
+
+# 🔁 What is still open, re-scheduled over the weeks that are left
+@app.post("/roadmap/replan")
+async def api_replan(req: ReplanRequest):
+    return await run_blocking(_replan, req)
+
+
+@app.post("/resources/youtube")
+async def api_fetch_youtube_links(req: LinksRequest):
+    results = await run_blocking(fetch_youtube_links_batch, req.queries, deadline=req.deadline)
+    return {"results": [[{"title": t, "url": u} for t, u in links] for links in results]}
+
+
+def _chat_chunks(req):
+    kwargs = {"format": req.format} if req.format is not None else {}
+    stream = get_gateway().chat_stream(model=req.model, messages=req.messages, keep_alive=req.keep_alive, **kwargs)
+    for chunk in stream:
+        line = {"content": chunk["message"]["content"]}
+        if chunk.get("done"):
+            line["done"] = True
+            for field in ("prompt_eval_count", "eval_count", "load_duration"):
+                line[field] = chunk.get(field)
+        yield _ndjson(line)
+
+
+# 💬 Streams newline-delimited JSON: {"content": "..."} per piece, then {"done": true}
+@app.post("/ask")
+async def api_ask(req: AskRequest):
+    if req.messages:
+        if req.model not in get_router().routed_models():
+            raise HTTPException(status_code=400, detail=f"model {req.model!r} is not served here")
+        chunks = _chat_chunks(req)
+    elif req.query:
+        chunks = (_ndjson({"content": piece}) for piece in ask_ai_stream(req.query))
+    else:
+        raise HTTPException(status_code=400, detail="either query or messages is required")
+
+    async def body():
+        async for line in stream_blocking(chunks):
+            yield line
+        if not req.messages:
+            yield _ndjson({"content": "", "done": True})
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+
+def _progress_summary(store):
+    return {
+        "user": store.user,
+        "weeks": store.data,
+        "goals": {goal: store.index.percent(goal) for goal in store.index.goals},
+        "overall": store.index.overall(),
+    }
+
+
+def _load_progress(user):
+    store = get_user_progress_store(user)
+    store.refresh()
+    return _progress_summary(store)
+
+
+@app.get("/progress/{user}")
+async def api_get_progress(user: str):
+    return await run_blocking(_load_progress, user)
+
+
+def _ensure_week(user, week_key, topics):
+    store = get_user_progress_store(user)
+    store.ensure_week(week_key, topics)
+    return {"week_key": week_key, "topics": store.get(week_key)}
+
+
+@app.post("/progress/{user}/weeks")
+async def api_ensure_week(user: str, req: WeekRequest):
+    return await run_blocking(_ensure_week, user, req.week_key, req.topics)
+
+
+def _set_progress(user, week_key, topic, done):
+    store = get_user_progress_store(user)
+    store.set(week_key, topic, done)
+    return {"week_key": week_key, "topic": topic, "done": done, "overall": store.index.overall()}
+
+
+@app.put("/progress/{user}")
+async def api_set_progress(user: str, req: ProgressUpdate):
+    return await run_blocking(_set_progress, user, req.week_key, req.topic, req.done)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return tracing.render_prometheus()
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="PathPlanner.AI HTTP API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    # One process: async handlers plus the worker pool; idle keep-alive connections are reused
+    uvicorn.run(app, host=args.host, port=args.port, timeout_keep_alive=KEEP_ALIVE_SECONDS)
+
+
+if __name__ == "__main__":
+    main()
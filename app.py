@@ -1,13 +1,43 @@
 import streamlit as st
-import json
 import os
 import random
-
-from roadmap_generator import generate_roadmap
-from utils import load_skills, save_progress, load_progress, calculate_progress
-from llm_utils import interpret_goal, generate_topic_roadmap, ask_ai
-from resource_suggester import fetch_youtube_links
-from exporter import save_roadmap_as_pdf
+import time
+
+import tracing
+
+from utils import calculate_progress
+from data_access import get_skills
+from resource_index import get_resource_index
+from user_progress import DEFAULT_USER
+from study_session import ChatSession
+from exporter import FORMATS as EXPORT_FORMATS, export_roadmap
+from llm_cache import get_cache
+from answer_cache import get_answer_cache
+from llm_gateway import get_gateway
+from model_router import get_router, start_warmup
+from goal_matcher import get_goal_matcher
+from prefetch import Prefetcher, goal_tasks, resource_links, topic_roadmap_key, topic_tasks
+
+# Optional: use a running api_server instead of doing the work in this process
+API_URL = os.environ.get("PATHPLANNER_API_URL")
+if API_URL:
+    from api_client import get_client
+    api = get_client()
+    interpret_goal = api.interpret_goal
+    generate_roadmap = api.generate_roadmap
+    generate_topic_roadmap = api.generate_topic_roadmap
+    stream_topic_roadmap = api.stream_topic_roadmap
+    fetch_youtube_links_batch = api.fetch_youtube_links_batch
+    get_user_progress_store = api.progress_store
+else:
+    from roadmap_generator import generate_roadmap
+    from llm_utils import interpret_goal, stream_topic_roadmap, generate_topic_roadmap
+    from resource_suggester import fetch_youtube_links_batch
+    from user_progress import get_user_progress_store
+    # Load the models in the background while the first page renders
+    start_warmup()
+
+_rerun_start = time.perf_counter()
 
 # Setup - MUST be first Streamlit command
 st.set_page_config(
@@ -159,16 +189,29 @@ st.markdown("""
 </div>
 """, unsafe_allow_html=True)
 
+# Each learner keeps their own progress file
+user_name = st.sidebar.text_input(
+    "👤 Your name",
+    value=DEFAULT_USER,
+    help="Progress is saved separately for every name"
+).strip() or DEFAULT_USER
+
 # Load data
 try:
-    skills_db = load_skills("skills_db.json")
-    with open("resources_db.json", "r") as f:
-        static_resources = json.load(f)
-    progress_data = load_progress("progress.json")
+    # Parsed once and reused across reruns until the files change on disk
+    skills_db = get_skills("skills_db.json")
+    resource_index = get_resource_index("resources_db.json")
+    progress_store = get_user_progress_store(user_name)
+    progress_store.refresh()
 except FileNotFoundError as e:
     st.error(f"❌ Error loading data files: {e}")
     st.stop()
 
+# Speculative work for this browser session (starts after a goal is analyzed)
+if "prefetcher" not in st.session_state:
+    st.session_state["prefetcher"] = Prefetcher()
+prefetcher = st.session_state["prefetcher"]
+
 # Enhanced sidebar
 with st.sidebar:
     st.markdown("### 🎯 Choose Your Learning Path")
@@ -184,9 +227,151 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("### 📊 Quick Stats")
-    total_progress = sum(calculate_progress(progress_data, goal) for goal in progress_data.keys()) / max(len(progress_data), 1)
+    total_progress = progress_store.index.overall()
     st.metric("Overall Progress", f"{total_progress:.1f}%")
-    st.metric("Active Goals", len(progress_data))
+    st.metric("Active Goals", progress_store.index.goal_count())
+    if API_URL:
+        # The model work happens on the server, so its counters are the ones that matter
+        health = api.health()
+        cache_stats, matcher_stats = health["cache"], health["goal_matcher"]
+        gateway_stats, routing = health["gateway"], health["router"]
+    else:
+        cache_stats, matcher_stats = get_cache().stats(), get_goal_matcher().stats()
+        gateway_stats, routing = get_gateway().stats(), get_router().stats()
+    st.caption(f"🗄️ AI cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses ({cache_stats['entries']} stored)")
+    st.caption(f"⚡ Known-goal fast path: {matcher_stats['hits']}/{matcher_stats['lookups']} goals resolved locally")
+    st.caption(f"🚦 AI queue: {gateway_stats['queue_depth']} waiting, {gateway_stats['background_queue_depth']} prefetches queued, {gateway_stats['in_flight']} running, avg wait {gateway_stats['avg_wait_ms']} ms")
+    routed = sum(t["requests"] for t in routing["tasks"].values())
+    if routed:
+        escalated = sum(t["escalated"] for t in routing["tasks"].values())
+        wasted = sum(t["wasted_tokens"] for t in routing["tasks"].values())
+        st.caption(f"🪜 Model routing: {routed - escalated}/{routed} answered by the small model, {wasted} tokens wasted on retries")
+    if routing["warmup_s"]:
+        st.caption("🔥 Warm-up: " + ", ".join(f"{m} {s:.1f}s" for m, s in routing["warmup_s"].items()))
+    prefetch_stats = prefetcher.stats()
+    st.caption(f"🔮 Prefetch: {prefetch_stats['hits']} ready / {prefetch_stats['misses']} missed (hit rate {prefetch_stats['hit_rate']:.0%})")
+
+    # Admin view of the near-duplicate StudyBot answer cache
+    with st.expander("🧠 Answer cache"):
+        answer_cache = get_answer_cache()
+        answer_stats = answer_cache.stats()
+        st.caption(
+            f"{answer_stats['entries']}/{answer_stats['max_entries']} answers · hit rate {answer_stats['hit_rate']:.0%} "
+            f"({answer_stats['hits']} hits, {answer_stats['misses']} misses, {answer_stats['evictions']} evicted) · "
+            f"{answer_stats['answer_kb'] + answer_stats['vector_kb']:.0f} KB"
+        )
+        stored = answer_cache.list_entries()
+        if stored:
+            st.dataframe(stored, hide_index=True)
+        if st.button("🗑️ Clear answer cache"):
+            answer_cache.clear()
+
+    # Optional latency debug panel (PATHPLANNER_TRACE=1)
+    if tracing.ENABLED:
+        if os.environ.get("PATHPLANNER_METRICS_PORT"):
+            tracing.serve_metrics(int(os.environ["PATHPLANNER_METRICS_PORT"]))
+        with st.expander("🩺 Latency debug"):
+            spans = tracing.snapshot()
+            if spans:
+                st.dataframe(
+                    [{"stage": name, **values} for name, values in spans.items()],
+                    hide_index=True
+                )
+            else:
+                st.caption("No traced calls yet.")
+            st.download_button("📥 Prometheus metrics", tracing.render_prometheus(), file_name="pathplanner.prom")
+
+# ✅ Checklist and progress for a saved goal roadmap; ticking a box reruns only this fragment
+@st.fragment
+def goal_checklist(saved):
+    goal = saved["goal"]
+    topic_links = saved["links"]
+    for week, topics in saved["roadmap"].items():
+        week_key = f"{goal}_{week}"
+
+        st.markdown(f"""
+        <div class="week-section">
+            <h3>📆 {week}</h3>
+        </div>
+        """, unsafe_allow_html=True)
+
+        progress_store.ensure_week(week_key, topics)
+
+        topic_cols = st.columns(2)
+        for i, topic in enumerate(topics):
+            with topic_cols[i % 2]:
+                checked = progress_store.get(week_key).get(topic, False)
+                checked = st.checkbox(
+                    f"✅ {topic}",
+                    value=checked,
+                    key=f"{week_key}_{topic}"
+                )
+                progress_store.set(week_key, topic, checked)
+
+                static_link = topic_links.get(topic)
+                if static_link:
+                    st.markdown(f"""
+                    <div class="resource-link">
+                        <a href="{static_link}" target="_blank">📘 Study Resource</a>
+                    </div>
+                    """, unsafe_allow_html=True)
+
+    # Enhanced progress tracking (read from the running index, no file I/O)
+    progress_percent = calculate_progress(progress_store.index, goal)
+    st.markdown("### 📈 Your Progress")
+    progress_col1, progress_col2 = st.columns(2)
+
+    with progress_col1:
+        st.progress(progress_percent / 100)
+    with progress_col2:
+        st.metric("Completion", f"{progress_percent}%", delta=f"{progress_percent}%")
+
+
+# 📤 Export controls; picking a format or downloading reruns only this fragment
+@st.fragment
+def export_controls(roadmap, key):
+    export_format = st.selectbox("📤 Export format:", list(EXPORT_FORMATS), key=f"{key}_export_format")
+    extension, mime = EXPORT_FORMATS[export_format]
+    st.download_button(
+        f"📤 Download {export_format.upper()}",
+        data=export_roadmap(roadmap, export_format),
+        file_name=f"study_plan.{extension}",
+        mime=mime,
+        help="Export your roadmap",
+        key=f"{key}_export_download"
+    )
+
+
+def topic_header(topic, weeks):
+    st.markdown(f"""
+    <div class="progress-container">
+        <h2>📘 Master {topic} in {weeks} Weeks</h2>
+        <p>AI-Generated Comprehensive Study Plan</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def topic_week(week, items):
+    st.markdown(f"""
+    <div class="week-section">
+        <h3>{week}</h3>
+    </div>
+    """, unsafe_allow_html=True)
+
+    for item in items:
+        st.markdown(f"• **{item}**")
+    return st.container()
+
+
+def video_links(slot, links):
+    if links:
+        with slot:
+            st.markdown("#### 🎥 Recommended Videos:")
+            video_cols = st.columns(2)
+            for i, (title, url) in enumerate(links[:4]):  # Limit to 4 videos
+                with video_cols[i % 2]:
+                    st.markdown(f"[🎥 {title[:50]}...]({url})")
+
 
 # Create three columns for better layout
 col1, col2, col3 = st.columns([1, 2, 1])
@@ -208,6 +393,10 @@ with col2:
                 placeholder="e.g., Crack GATE 2026, Master Machine Learning, Learn Web Development",
                 help="Be specific about your learning objective"
             ).strip()
+
+            # A different goal makes anything speculated for the old one useless
+            if prefetcher.goal is not None and prefetcher.goal != goal:
+                prefetcher.cancel()
             
             col_analyze, col_space = st.columns([1, 3])
             with col_analyze:
@@ -223,6 +412,10 @@ with col2:
 
                             st.session_state["selected_track"] = auto_tracks[0] if auto_tracks else "general"
                             st.session_state["custom_topics"] = auto_topics
+
+                            # Warm the model answers a Topic mode visit will most likely ask for
+                            if auto_topics:
+                                prefetcher.start(goal, goal_tasks(auto_topics, topic_roadmap_fn=generate_topic_roadmap))
                             
                             st.markdown(f"""
                             <div class="success-message">
@@ -257,73 +450,39 @@ with col2:
                 )
             
             with col_weeks:
-                weeks = st.slider("🗓️ Duration (weeks):", 1, 20, 8, help="Choose your preferred timeline")
+                weeks = st.slider("🗓️ Duration (weeks):", 1, 20, 8, help="Choose your preferred timeline", key="goal_weeks")
+
+            topic_list = st.session_state.get("custom_topics", skills_db.get(track, []))
 
             st.markdown("### Step 3: Generate Your Roadmap")
             if st.button("📅 Generate Roadmap", type="primary"):
                 with st.spinner("🚀 Creating your personalized roadmap..."):
                     try:
-                        topic_list = st.session_state.get("custom_topics", skills_db[track])
                         roadmap = generate_roadmap(topic_list, weeks, goal)
-                        
-                        st.markdown(f"""
-                        <div class="progress-container">
-                            <h2>📘 Your Learning Roadmap: {goal}</h2>
-                            <p>Duration: {weeks} weeks | Track: {track}</p>
-                        </div>
-                        """, unsafe_allow_html=True)
-
-                        for week, topics in roadmap.items():
-                            week_key = f"{goal}_{week}"
-                            
-                            st.markdown(f"""
-                            <div class="week-section">
-                                <h3>📆 {week}</h3>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            if week_key not in progress_data:
-                                progress_data[week_key] = {}
-                                
-                            topic_cols = st.columns(2)
-                            for i, topic in enumerate(topics):
-                                with topic_cols[i % 2]:
-                                    checked = progress_data[week_key].get(topic, False)
-                                    checked = st.checkbox(
-                                        f"✅ {topic}", 
-                                        value=checked, 
-                                        key=f"{week}_{topic}"
-                                    )
-                                    progress_data[week_key][topic] = checked
-
-                                    static_link = static_resources.get(topic)
-                                    if static_link:
-                                        st.markdown(f"""
-                                        <div class="resource-link">
-                                            <a href="{static_link}" target="_blank">📘 Study Resource</a>
-                                        </div>
-                                        """, unsafe_allow_html=True)
-
-                        save_progress(progress_data, "progress.json")
-
-                        # Enhanced progress tracking
-                        progress_percent = calculate_progress(progress_data, goal)
-                        st.markdown("### 📈 Your Progress")
-                        progress_col1, progress_col2 = st.columns(2)
-                        
-                        with progress_col1:
-                            st.progress(progress_percent / 100)
-                        with progress_col2:
-                            st.metric("Completion", f"{progress_percent}%", delta=f"{progress_percent}%")
-
-                        # Export option
-                        if st.button("📤 Download PDF", help="Export your roadmap as a PDF"):
-                            save_roadmap_as_pdf(roadmap)
-                            st.success("✅ Roadmap saved as study_plan.pdf")
-                    
+
+                        # Best catalog match per topic, looked up for the whole roadmap at once
+                        topic_links = resource_links(resource_index, topic_list)
+
+                        # Kept across reruns so ticking a checkbox doesn't throw the plan away
+                        st.session_state["goal_roadmap"] = {
+                            "goal": goal, "weeks": weeks, "track": track,
+                            "roadmap": roadmap, "links": topic_links,
+                        }
                     except Exception as e:
                         st.error(f"❌ Error generating roadmap: {e}")
 
+            saved_roadmap = st.session_state.get("goal_roadmap")
+            if saved_roadmap and saved_roadmap["goal"] == goal:
+                st.markdown(f"""
+                <div class="progress-container">
+                    <h2>📘 Your Learning Roadmap: {goal}</h2>
+                    <p>Duration: {saved_roadmap['weeks']} weeks | Track: {saved_roadmap['track']}</p>
+                </div>
+                """, unsafe_allow_html=True)
+
+                goal_checklist(saved_roadmap)
+                export_controls(saved_roadmap["roadmap"], "goal")
+
     # ------------------ MODE 2: Topic Breakdown ------------------
     elif mode == "📘 Topic-Focused AI Roadmap":
         st.markdown("""
@@ -346,41 +505,44 @@ with col2:
         with col_weeks:
             weeks = st.slider("⏱️ Study Duration:", 1, 12, 3)
 
-        if st.button("🧠 Generate AI Study Plan", type="primary"):
+        generate_clicked = st.button("🧠 Generate AI Study Plan", type="primary")
+        if generate_clicked:
             if topic:
                 with st.spinner(f"🚀 Creating detailed study plan for {topic}..."):
                     try:
-                        roadmap = generate_topic_roadmap(topic, weeks)
-                        if roadmap:
-                            st.markdown(f"""
-                            <div class="progress-container">
-                                <h2>📘 Master {topic} in {weeks} Weeks</h2>
-                                <p>AI-Generated Comprehensive Study Plan</p>
-                            </div>
-                            """, unsafe_allow_html=True)
-                            
-                            for week, items in roadmap.items():
-                                st.markdown(f"""
-                                <div class="week-section">
-                                    <h3>{week}</h3>
-                                </div>
-                                """, unsafe_allow_html=True)
-                                
-                                item_cols = st.columns(1)
-                                for item in items:
-                                    st.markdown(f"• **{item}**")
-
-                                # YouTube resources
-                                with st.spinner("🔗 Finding relevant video resources..."):
-                                    links = fetch_youtube_links(f"{topic} {week}")
-                                    if links:
-                                        st.markdown("#### 🎥 Recommended Videos:")
-                                        video_cols = st.columns(2)
-                                        for i, (title, url) in enumerate(links[:4]):  # Limit to 4 videos
-                                            with video_cols[i % 2]:
-                                                st.markdown(f"[🎥 {title[:50]}...]({url})")
-                        else:
+                        topic_header(topic, weeks)
+
+                        # Counts toward the prefetch hit rate when Goal mode already warmed this topic
+                        prefetcher.claim(topic_roadmap_key(topic, weeks))
+
+                        # Weeks are rendered as soon as the model closes each one
+                        plan = st.empty()
+                        weeks_box = plan.container()
+                        roadmap = {}
+                        link_slots = []
+                        for week, items in stream_topic_roadmap(topic, weeks):
+                            if week is None:
+                                # The first answer was rejected: show the escalated plan instead
+                                weeks_box = plan.container()
+                                roadmap, link_slots = {}, []
+                                continue
+                            roadmap[week] = items
+                            with weeks_box:
+                                link_slots.append(topic_week(week, items))
+
+                        # YouTube resources for every week, fetched concurrently
+                        with st.spinner("🔗 Finding relevant video resources..."):
+                            all_links = fetch_youtube_links_batch([f"{topic} {week}" for week in roadmap])
+                        for slot, links in zip(link_slots, all_links):
+                            video_links(slot, links)
+
+                        if not roadmap:
                             st.error("❌ Unable to generate roadmap. Please try a different topic.")
+                        else:
+                            st.session_state["topic_roadmap"] = {
+                                "topic": topic, "weeks": weeks, "roadmap": roadmap, "links": all_links,
+                            }
+                            export_controls(roadmap, "topic")
                     except Exception as e:
                         st.error(f"❌ Error generating study plan: {e}")
             else:
@@ -389,6 +551,18 @@ with col2:
                     ⚠️ Please enter a topic to generate your study plan.
                 </div>
                 """, unsafe_allow_html=True)
+        else:
+            # A suggested topic at another duration is warmed as soon as the slider settles
+            if topic:
+                prefetcher.extend(topic_tasks(topic, weeks, st.session_state.get("custom_topics", []),
+                                              topic_roadmap_fn=generate_topic_roadmap))
+            # Later reruns redraw the last plan (and its links) without asking the model again
+            saved_plan = st.session_state.get("topic_roadmap")
+            if saved_plan and saved_plan["topic"] == topic:
+                topic_header(saved_plan["topic"], saved_plan["weeks"])
+                for (week, items), links in zip(saved_plan["roadmap"].items(), saved_plan["links"]):
+                    video_links(topic_week(week, items), links)
+                export_controls(saved_plan["roadmap"], "topic")
 
     # ------------------ MODE 3: Ask StudyBot ------------------
     elif mode == "💬 Ask StudyBot":
@@ -411,6 +585,15 @@ with col2:
             • Can you explain photosynthesis in simple terms?
             """)
         
+        # Conversation so far (kept for this browser session)
+        chat = st.session_state.setdefault("study_chat", ChatSession())
+        for past_question, past_answer in chat.turns:
+            st.markdown(f"**🧑‍🎓 You:** {past_question}")
+            st.markdown(past_answer)
+
+        # Follow-up buttons queue their question for this rerun
+        query_to_send = st.session_state.pop("followup_query", None)
+
         query = st.text_area(
             "💬 Ask me anything academic:", 
             height=100,
@@ -419,30 +602,7 @@ with col2:
         
         if st.button("📤 Get Answer", type="primary"):
             if query:
-                with st.spinner("🤖 StudyBot is thinking..."):
-                    try:
-                        response = ask_ai(query)
-                        
-                        st.markdown("""
-                        <div class="mode-card">
-                            <h4>🤖 StudyBot's Response:</h4>
-                        </div>
-                        """, unsafe_allow_html=True)
-                        
-                        st.markdown(response)
-                        
-                        # Follow-up suggestions
-                        st.markdown("### 💡 Follow-up Questions:")
-                        follow_up_cols = st.columns(2)
-                        with follow_up_cols[0]:
-                            if st.button("🔍 Can you explain this further?"):
-                                st.text_area("Follow-up:", value=f"Can you explain '{query}' in more detail?")
-                        with follow_up_cols[1]:
-                            if st.button("📝 Give me practice problems"):
-                                st.text_area("Follow-up:", value=f"Can you give me practice problems for '{query}'?")
-                    
-                    except Exception as e:
-                        st.error(f"❌ Error getting response: {e}")
+                query_to_send = query
             else:
                 st.markdown("""
                 <div class="warning-message">
@@ -450,6 +610,42 @@ with col2:
                 </div>
                 """, unsafe_allow_html=True)
 
+        if query_to_send:
+            try:
+                st.markdown(f"**🧑‍🎓 You:** {query_to_send}")
+                st.markdown("""
+                <div class="mode-card">
+                    <h4>🤖 StudyBot's Response:</h4>
+                </div>
+                """, unsafe_allow_html=True)
+
+                # Tokens are written as they arrive instead of after the whole answer
+                response = st.write_stream(chat.ask_stream(query_to_send))
+            except Exception as e:
+                st.error(f"❌ Error getting response: {e}")
+
+        if chat.turns:
+            last_question = chat.turns[-1][0]
+
+            def queue_followup(text):
+                st.session_state["followup_query"] = text
+
+            # Follow-up suggestions
+            st.markdown("### 💡 Follow-up Questions:")
+            follow_up_cols = st.columns(3)
+            with follow_up_cols[0]:
+                st.button("🔍 Can you explain this further?", on_click=queue_followup,
+                          args=(f"Can you explain '{last_question}' in more detail?",))
+            with follow_up_cols[1]:
+                st.button("📝 Give me practice problems", on_click=queue_followup,
+                          args=(f"Can you give me practice problems for '{last_question}'?",))
+            with follow_up_cols[2]:
+                st.button("🧹 New conversation", on_click=chat.reset)
+
+            with st.expander("📏 Conversation stats"):
+                st.dataframe(chat.turn_stats, hide_index=True)
+                st.caption(f"Prompt budget: {chat.budget} tokens · {chat.window_start} earlier turns summarized")
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -457,4 +653,7 @@ st.markdown("""
     <p>🚀 <strong>PathPlanner.AI</strong> - Empowering learners worldwide with AI-driven education</p>
     <p>Made with ❤️ for ambitious learners</p>
 </div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+""", unsafe_allow_html=True)
+
+if tracing.ENABLED:
+    tracing.observe("app.rerun", time.perf_counter() - _rerun_start)
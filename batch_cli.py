@@ -0,0 +1,200 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from roadmap_generator import generate_roadmap
+from data_access import get_skills
+from llm_utils import interpret_goal, generate_topic_roadmap
+from llm_gateway import LLMGateway, set_gateway
+
+DEFAULT_WEEKS = 8
+
+# 📦 Headless roadmap generation for whole cohorts.
+#
+# Input is JSONL, one record per line:
+#   {"id": "s1", "goal": "Crack GATE 2026", "weeks": 12}
+#   {"id": "s2", "topic": "Trigonometry", "weeks": 3}
+# Output is JSONL in input order, one result per record.
+
+
+def read_records(path):
+    records = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError as e:
+                record = {"_error": f"invalid JSON on line {line_no}: {e}"}
+            record.setdefault("id", str(line_no))
+            records.append(record)
+    return records
+
+
+# Successful results already in an output file, by id; --resume keeps these and retries the rest
+def completed_results(output_path):
+    done = {}
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                result = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(result, dict) and "id" in result and not result.get("error"):
+                done[str(result["id"])] = result
+    return done
+
+
+def process_record(record, skills_db):
+    start = time.perf_counter()
+    result = {"id": record["id"]}
+    try:
+        if "_error" in record:
+            raise ValueError(record["_error"])
+        weeks = int(record.get("weeks", DEFAULT_WEEKS))
+        if weeks < 1:
+            raise ValueError("weeks must be at least 1")
+        if record.get("goal"):
+            goal = record["goal"].strip()
+            ai_output = interpret_goal(goal)
+            tracks = ai_output.get("tracks", [])
+            topics = ai_output.get("topics", [])
+            track = tracks[0] if tracks else "general"
+            if not topics:
+                topics = skills_db.get(track, skills_db.get("general", []))
+            result.update(kind="goal", goal=goal, weeks=weeks, track=track,
+                          roadmap=generate_roadmap(topics, weeks, goal))
+        elif record.get("topic"):
+            topic = record["topic"].strip()
+            roadmap = generate_topic_roadmap(topic, weeks)
+            if not roadmap:
+                raise ValueError("model returned no usable roadmap")
+            result.update(kind="topic", topic=topic, weeks=weeks, roadmap=roadmap)
+        else:
+            raise ValueError("record needs a 'goal' or a 'topic'")
+    except Exception as e:
+        result["error"] = str(e)
+    result["elapsed_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return result
+
+
+# ✍️ Writes results in input order, even though workers finish out of order
+class OrderedWriter:
+    def __init__(self, stream):
+        self.stream = stream
+        self.pending = {}
+        self.next_index = 0
+        self.lock = threading.Lock()
+
+    def submit(self, index, result):
+        with self.lock:
+            self.pending[index] = result
+            while self.next_index in self.pending:
+                item = self.pending.pop(self.next_index)
+                if item is not None:
+                    self.stream.write(json.dumps(item, ensure_ascii=False) + "\n")
+                    self.stream.flush()
+                self.next_index += 1
+
+
+# Records whose id is in `previous` are not run again; their earlier result is written in its place
+def run_batch(records, out_stream, concurrency=2, previous=None):
+    previous = previous or {}
+    skills_db = get_skills()
+    writer = OrderedWriter(out_stream)
+    timings = []
+    errors = 0
+    skipped = 0
+    start = time.perf_counter()
+
+    def work(index, record):
+        result = process_record(record, skills_db)
+        writer.submit(index, result)
+        return result
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = []
+        for index, record in enumerate(records):
+            if str(record["id"]) in previous:
+                skipped += 1
+                writer.submit(index, previous[str(record["id"])])
+                continue
+            futures.append(executor.submit(work, index, record))
+        for future in futures:
+            result = future.result()
+            timings.append(result["elapsed_ms"])
+            if result.get("error"):
+                errors += 1
+
+    wall = time.perf_counter() - start
+    timings.sort()
+    return {
+        "processed": len(timings),
+        "skipped": skipped,
+        "errors": errors,
+        "wall_s": round(wall, 2),
+        "records_per_s": round(len(timings) / wall, 2) if wall > 0 else 0.0,
+        "p50_ms": timings[len(timings) // 2] if timings else 0.0,
+        "max_ms": timings[-1] if timings else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate roadmaps for a JSONL file of goals/topics")
+    parser.add_argument("input", help="JSONL file of {id, goal|topic, weeks} records")
+    parser.add_argument("-o", "--output", help="JSONL output file (default: stdout)")
+    parser.add_argument("-c", "--concurrency", type=int, default=2, help="concurrent LLM requests")
+    parser.add_argument("--resume", action="store_true",
+                        help="keep results already written successfully to --output and retry the rest; "
+                             "the file is rewritten in input order")
+    args = parser.parse_args()
+
+    records = read_records(args.input)
+    set_gateway(LLMGateway(max_concurrency=max(args.concurrency, 1)))
+    previous = {}
+    tmp_path = None
+    if args.output and args.resume:
+        previous = completed_results(args.output)
+        # The merged file is built next to the old one and only replaces it once the batch is
+        # done, so an interrupted resume leaves the previous output untouched
+        fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=os.path.dirname(os.path.abspath(args.output)))
+        out_stream = os.fdopen(fd, "w")
+    elif args.output:
+        out_stream = open(args.output, "w")
+    else:
+        out_stream = sys.stdout
+
+    try:
+        summary = run_batch(records, out_stream, max(args.concurrency, 1), previous)
+    except BaseException:
+        if out_stream is not sys.stdout:
+            out_stream.close()
+        if tmp_path is not None:
+            os.remove(tmp_path)
+        raise
+    if tmp_path is not None:
+        out_stream.flush()
+        os.fsync(out_stream.fileno())
+    if out_stream is not sys.stdout:
+        out_stream.close()
+    if tmp_path is not None:
+        os.replace(tmp_path, args.output)
+    print(
+        f"📦 {summary['processed']} processed, {summary['skipped']} skipped (resume), "
+        f"{summary['errors']} errors in {summary['wall_s']}s "
+        f"({summary['records_per_s']} records/s, p50 {summary['p50_ms']} ms, max {summary['max_ms']} ms)",
+        file=sys.stderr,
+    )
+
+
+if __name__ == "__main__":
+    main()
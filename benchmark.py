@@ -0,0 +1,612 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(HERE, "benchmark_baseline.json")
+SIZES = [10, 100, 1_000, 10_000, 100_000, 1_000_000]
+
+# ⏱️ Benchmarks for PathPlanner.AI. Run `python benchmark.py <name>`; see --help for the list.
+# Every row printed by report() is also recorded, so runs can be saved as a baseline and compared.
+
+RESULTS = {}
+_current = ""
+
+
+def timeit(fn, repeat=5, number=1):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return min(samples), statistics.median(samples)
+
+
+def report(rows):
+    width = max(len(name) for name, _, _ in rows)
+    for name, best, median in rows:
+        RESULTS[f"{_current}/{name}"] = {"best": best, "median": median}
+        print(f"  {name:<{width}}  best {best * 1000:9.3f} ms   median {median * 1000:9.3f} ms")
+
+
+def _repeat_for(size):
+    return 7 if size <= 10_000 else 3 if size <= 100_000 else 1
+
+
+def _import_time(statement):
+    code = f"import time; t = time.perf_counter(); {statement}; print(time.perf_counter() - t)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE, capture_output=True, text=True, check=True
+    )
+    return float(out.stdout.strip())
+
+
+# 🚀 Module import cost and per-rerun data loading, before vs after the cached data layer
+def bench_startup(args):
+    app_modules = "import roadmap_generator, utils, data_access, progress_store, llm_utils, resource_suggester, exporter, llm_cache"
+    eager = "import ollama, bs4, requests; " + app_modules
+    print("Import (fresh interpreter, median of 5):")
+    rows = []
+    for name, stmt in [("eager heavy imports", eager), ("lazy app imports", app_modules)]:
+        samples = [_import_time(stmt) for _ in range(5)]
+        rows.append((name, min(samples), statistics.median(samples)))
+    report(rows)
+
+    import data_access
+    from progress_store import ProgressStore
+    from utils import load_progress
+
+    workdir = tempfile.mkdtemp()
+    try:
+        for name in ["skills_db.json", "resources_db.json", "progress.json"]:
+            shutil.copy(os.path.join(HERE, name), workdir)
+        skills = os.path.join(workdir, "skills_db.json")
+        resources = os.path.join(workdir, "resources_db.json")
+        progress = os.path.join(workdir, "progress.json")
+
+        def legacy_rerun():
+            with open(skills) as f:
+                json.load(f)
+            with open(resources) as f:
+                json.load(f)
+            load_progress(progress)
+
+        store = ProgressStore(progress, flush_delay=None)
+
+        def cached_rerun():
+            data_access.get_skills(skills)
+            data_access.get_resources(resources)
+            store.refresh()
+
+        print("Per-rerun data loading:")
+        report([
+            ("re-parse every rerun", *timeit(legacy_rerun, repeat=7, number=200)),
+            ("mtime-cached", *timeit(cached_rerun, repeat=7, number=200)),
+        ])
+    finally:
+        shutil.rmtree(workdir)
+
+
+# 🚦 Identical concurrent prompts through the LLM gateway vs. straight to the (fake) model
+def bench_gateway(args):
+    import threading
+    from fake_services import FakeOllama
+    from llm_gateway import LLMGateway
+
+    def run(chat, sessions=20):
+        threads = [
+            threading.Thread(target=chat, kwargs={"model": "m", "messages": [{"role": "user", "content": "Crack GATE 2026"}]})
+            for _ in range(sessions)
+        ]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        return time.perf_counter() - start
+
+    direct = FakeOllama(latency=0.2)
+    direct_wall = run(direct.chat)
+    fake = FakeOllama(latency=0.2)
+    gateway = LLMGateway(max_concurrency=2, backend=fake.chat)
+    gateway_wall = run(gateway.chat)
+    print(f"  direct:  {direct.calls} model calls, peak concurrency {direct.max_active}, {direct_wall * 1000:.0f} ms")
+    print(f"  gateway: {fake.calls} model calls, peak concurrency {fake.max_active}, {gateway_wall * 1000:.0f} ms")
+    print(f"  gateway stats: {gateway.stats()}")
+    failures = check_gateway()
+    if fake.calls != 1:
+        failures.append(f"single-flight: 20 identical calls reached the model {fake.calls} times, expected 1")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ single-flight, FIFO admission, background lane and timeouts behave")
+
+
+# 🧪 Gateway guarantees against the fake model; returns a list of what broke
+def check_gateway():
+    import threading
+    from fake_services import FakeOllama
+    from llm_gateway import GatewayTimeout, LLMGateway, background
+
+    failures = []
+
+    def ask(gateway, prompt, **kwargs):
+        return gateway.chat(model="m", messages=[{"role": "user", "content": prompt}], **kwargs)
+
+    # Admission order: with one slot held, waiters are let in exactly in arrival order
+    order = []
+    fake = FakeOllama(latency=0.05, responder=lambda model, messages: order.append(messages[-1]["content"]) or "ok")
+    gateway = LLMGateway(max_concurrency=1, backend=fake.chat)
+    threads = [threading.Thread(target=ask, args=(gateway, f"q{i}")) for i in range(6)]
+    for t in threads:
+        t.start()
+        time.sleep(0.01)
+    for t in threads:
+        t.join()
+    if order != [f"q{i}" for i in range(6)]:
+        failures.append(f"FIFO admission: model saw {order}")
+
+    # A caller whose deadline passes while queued gets GatewayTimeout, promptly
+    gateway = LLMGateway(max_concurrency=1, backend=FakeOllama(latency=0.5).chat)
+    blocker = threading.Thread(target=ask, args=(gateway, "slow"))
+    blocker.start()
+    time.sleep(0.05)
+    for what, call in [
+        ("queued call", lambda: ask(gateway, "waiting", timeout=0.1)),
+        ("running call", lambda: ask(LLMGateway(backend=FakeOllama(latency=0.5).chat), "slow", timeout=0.1)),
+        ("stalled stream", lambda: list(LLMGateway(backend=FakeOllama(latency=0.0, token_delay=0.5).chat)
+                                        .chat_stream(model="m", messages=[{"role": "user", "content": "a b c"}],
+                                                     timeout=0.1))),
+    ]:
+        start = time.perf_counter()
+        try:
+            call()
+        except GatewayTimeout:
+            elapsed = time.perf_counter() - start
+            if elapsed > 0.3:
+                failures.append(f"timeout: {what} took {elapsed * 1000:.0f} ms to give up, deadline 100 ms")
+        else:
+            failures.append(f"timeout: {what} did not raise GatewayTimeout")
+    blocker.join()
+
+    # Background lane: speculative calls never take the last free slot and wait behind
+    # interactive ones; an interactive caller joining a queued speculative call promotes it
+    order = []
+    fake = FakeOllama(latency=0.1, responder=lambda model, messages: order.append(messages[-1]["content"]) or "ok")
+    gateway = LLMGateway(max_concurrency=2, backend=fake.chat)
+
+    def speculate(prompt):
+        with background():
+            ask(gateway, prompt)
+
+    threads = [threading.Thread(target=speculate, args=(f"bg{i}",)) for i in range(3)]
+    threads += [threading.Thread(target=ask, args=(gateway, p)) for p in ("fg", "bg2")]
+    for t in threads:
+        t.start()
+        time.sleep(0.01)
+    for t in threads:
+        t.join()
+    if order != ["bg0", "fg", "bg2", "bg1"]:
+        failures.append(f"background lane: model saw {order}, expected ['bg0', 'fg', 'bg2', 'bg1']")
+    if fake.max_active > 2:
+        failures.append(f"background lane: {fake.max_active} calls ran at once with 2 slots")
+    return failures
+
+
+# 🪜 Goal interpretation on the large model alone vs. small-first routing with escalation
+def bench_routing(args):
+    import llm_gateway
+    import model_router
+    from fake_services import FakeOllama
+    from llm_utils import interpret_goal
+
+    small, large = model_router.SMALL_MODEL or "small", model_router.LARGE_MODEL
+    profiles = {small: {"latency": 0.05, "prose_rate": 0.2}, large: {"latency": 0.4}}
+    routes = {
+        "large only": {"interpret_goal": {"models": (large,), "budget": None}},
+        "small first": {"interpret_goal": {"models": (small, large), "budget": 10.0}},
+    }
+    rows = []
+    for name, route in routes.items():
+        random.seed(3)
+        fake = FakeOllama(models=profiles)
+        llm_gateway.set_gateway(llm_gateway.LLMGateway(backend=fake.chat))
+        router = model_router.ModelRouter(routes=route)
+        model_router.set_router(router)
+        samples = []
+        for i in range(20):
+            start = time.perf_counter()
+            interpret_goal(f"learn subject {i}", use_cache=False, use_local=False)
+            samples.append(time.perf_counter() - start)
+        rows.append((name, min(samples), statistics.median(samples)))
+        task = router.stats()["tasks"]["interpret_goal"]
+        print(f"  {name}: mean {statistics.mean(samples) * 1000:.0f} ms, calls {fake.calls_by_model}, "
+              f"escalation rate {task['escalation_rate']:.0%}")
+    model_router.set_router(None)
+    llm_gateway.set_gateway(None)
+    report(rows)
+
+
+def _synthetic_roadmaps(n, weeks=12, per_week=4):
+    return [
+        {f"Week {w}": [f"Roadmap {i} topic {w}.{t}" for t in range(per_week)] for w in range(1, weeks + 1)}
+        for i in range(n)
+    ]
+
+
+# 📤 Export 1,000 roadmaps in every format
+def bench_export(args):
+    import io
+    import exporter
+
+    roadmaps = _synthetic_roadmaps(1000)
+    rows = []
+    for fmt in exporter.RENDERERS:
+        rows.append((f"{fmt} x1000", *timeit(lambda: exporter.export_roadmaps(roadmaps, fmt, stream=io.BytesIO()), repeat=3)))
+
+    def legacy_html():
+        # The old string-concatenation HTML builder, without the wkhtmltopdf step
+        for roadmap in roadmaps:
+            html = "<h1>PathPlanner.AI – Your Study Roadmap</h1>"
+            for week, topics in roadmap.items():
+                html += f"<h2>{week}</h2><ul>"
+                for t in topics:
+                    html += f"<li>{t}</li>"
+                html += "</ul>"
+
+    rows.append(("legacy html concat x1000", *timeit(legacy_html, repeat=3)))
+    report(rows)
+
+
+def _synthetic_catalog(n, seed=7):
+    import random
+    rng = random.Random(seed)
+    # A few thousand pseudo-words so n-gram frequencies look like a real catalog, not 20 stems repeated
+    syllables = ["al", "ge", "bra", "tri", "go", "no", "me", "try", "cal", "cu", "lus", "sta", "tis", "tics",
+                 "pro", "ba", "bil", "ity", "mec", "ha", "nics", "op", "ther", "mo", "dy", "nam", "gen",
+                 "eco", "lo", "gy", "or", "ga", "nic", "vec", "tor", "ma", "trix", "wa", "ve", "ion", "ra"]
+    words = sorted({"".join(rng.choice(syllables) for _ in range(rng.randint(2, 4))) for _ in range(6000)})
+    words += ["algebra", "geometry", "calculus", "trigonometry", "statistics", "probability", "polynomials",
+              "organic", "chemistry", "reactions", "graph", "algorithms", "matrices", "vectors", "optics"]
+    catalog = {}
+    while len(catalog) < n:
+        name = " ".join(rng.choice(words).title() for _ in range(rng.randint(2, 4)))
+        catalog[name] = f"https://example.com/{len(catalog)}"
+    return catalog
+
+
+# 🔎 Fuzzy resource lookup at 100k catalog entries, within QUERY_BUDGET seconds per query (median)
+QUERY_BUDGET = 0.001
+
+
+def bench_resource_index(args):
+    from resource_index import ResourceIndex
+
+    catalog = _synthetic_catalog(100_000)
+    start = time.perf_counter()
+    index = ResourceIndex(catalog)
+    print(f"  build 100k entries: {(time.perf_counter() - start) * 1000:.0f} ms")
+    queries = ["Trigonometric Ratios", "polynomials", "Organic chemistry reactions", "graph algorithms",
+               "probability theory", "Matrices and vectors", "thermodynamics laws", "wave optics"] * 4
+    best, median = timeit(lambda: index.search("Trigonometric Ratios", k=5), repeat=20)
+    batch_best, batch_median = timeit(lambda: index.search_batch(queries, k=5), repeat=10)
+    report([
+        ("single query", best, median),
+        (f"batch of {len(queries)}, per query", batch_best / len(queries), batch_median / len(queries)),
+    ])
+    failures = check_resource_links()
+    for name, per_query in (("single query", median), ("batch", batch_median / len(queries))):
+        if per_query > QUERY_BUDGET:
+            failures.append(f"{name}: {per_query * 1000:.3f} ms per query, budget {QUERY_BUDGET * 1000:.0f} ms")
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"  ✅ under {QUERY_BUDGET * 1000:.0f} ms per query; skills_db topics link to the right catalog entries")
+
+
+# 🧪 Links the roadmap view would show for the real skills_db topics; returns what broke
+def check_resource_links():
+    from data_access import get_skills
+    from resource_index import MIN_SCORE, get_resource_index
+
+    expected = {
+        "Polynomials": "Polynomials",
+        "Real Numbers": "Real Numbers",
+        "Trigonometry": "Trigonometry",
+        "Trigonometric Functions": "Trigonometry",
+        "Inverse Trigonometric Functions": "Trigonometry",
+        "Data Structures": "Data Structures",
+        "Operating Systems": "Operating Systems",
+        "Linear Regression": "Linear Regression",
+        "Number Systems": None,
+        "Structure of the Atom": None,
+        "Structure of Atom": None,
+        "Cell: Structure and Function": None,
+        "Linear Programming": None,
+        "Complex Numbers and Quadratic Equations": None,
+    }
+    topics = [t for ts in get_skills("skills_db.json").values() for t in ts]
+    missing = sorted(set(expected) - set(topics))
+    failures = [f"{t!r} is no longer in skills_db.json" for t in missing]
+    checked = [t for t in expected if t not in missing]
+    index = get_resource_index("resources_db.json")
+    for topic, matches in zip(checked, index.search_batch(checked, k=1, min_score=MIN_SCORE)):
+        got = matches[0][0] if matches else None
+        if got != expected[topic]:
+            failures.append(f"resource link: {topic!r} -> {got!r}, expected {expected[topic]!r}")
+    return failures
+
+
+# 🧪 Synthetic data generators for the pure hot paths
+def _synthetic_progress(n_entries, topics_per_week=4):
+    data = {}
+    goals = max(n_entries // (topics_per_week * 10), 1)
+    i = 0
+    while i < n_entries:
+        goal = f"goal {i % goals}"
+        week_key = f"{goal}_Week {i // (goals * topics_per_week) + 1}"
+        week = data.setdefault(week_key, {})
+        week[f"Topic {i}"] = i % 3 == 0
+        i += 1
+    return data
+
+
+def _synthetic_completion(n_weeks):
+    body = json.dumps({f"Week {i}": [f"Subtopic {i}.1", f"Subtopic {i}.2"] for i in range(1, n_weeks + 1)}, indent=2)
+    return "Sure! Here is your roadmap:\n" + body + "\nLet me know if you need anything else."
+
+
+def _synthetic_results_page(n_links):
+    from fake_services import ddg_results_page
+    return ddg_results_page("synthetic query", n_links)
+
+
+# 🔥 Pure hot paths at sizes from 10 to --max-size entries
+def bench_hotpaths(args):
+    from roadmap_generator import generate_roadmap
+    from utils import calculate_progress, load_progress, save_progress, ProgressIndex
+    from llm_utils import extract_json
+    from resource_suggester import parse_youtube_links
+
+    sizes = [s for s in SIZES if s <= args.max_size]
+    workdir = tempfile.mkdtemp()
+    try:
+        for size in sizes:
+            rows = []
+            repeat = _repeat_for(size)
+            topics = [f"Topic {i}" for i in range(size)]
+            rows.append((f"generate_roadmap n={size}", *timeit(lambda: generate_roadmap(topics, 12), repeat)))
+
+            progress = _synthetic_progress(size)
+            rows.append((f"calculate_progress n={size}", *timeit(lambda: calculate_progress(progress, "goal 0"), repeat)))
+            rows.append((f"ProgressIndex.from_progress n={size}", *timeit(lambda: ProgressIndex.from_progress(progress), repeat)))
+
+            path = os.path.join(workdir, f"progress_{size}.json")
+            rows.append((f"save_progress n={size}", *timeit(lambda: save_progress(progress, path), repeat)))
+            rows.append((f"load_progress n={size}", *timeit(lambda: load_progress(path), repeat)))
+
+            # A completion with `size` roadmap entries
+            completion = _synthetic_completion(max(size // 2, 1))
+            rows.append((f"extract_json n={size}", *timeit(lambda: extract_json(completion), repeat)))
+
+            if size <= args.max_html_size:
+                page = _synthetic_results_page(size)
+                rows.append((f"parse_youtube_links n={size}", *timeit(lambda: parse_youtube_links(page), repeat)))
+            report(rows)
+    finally:
+        shutil.rmtree(workdir)
+
+
+def _realistic_results_page(n_results, youtube_at=(4, 9, 15), pad=1500):
+    # Result blocks with inline script/style noise, YouTube hits scattered down the page
+    noise = "<script>var x = %s;</script><style>.r{margin:0}</style>" % ("0," * (pad // 2))
+    rows = []
+    for i in range(n_results):
+        if i in youtube_at:
+            href = f"https://www.youtube.com/watch?v=real{i:04d}"
+        else:
+            href = f"https://example.org/article/{i}"
+        rows.append(
+            f'<div class="result results_links web-result"><div class="links_main">'
+            f'<h2 class="result__title"><a rel="nofollow" class="result__a" href="{href}">Result {i} &amp; more</a></h2>'
+            f'<a class="result__snippet" href="{href}">Snippet text for result {i} with <b>bold</b> words.</a>'
+            f'</div></div>{noise if i % 5 == 0 else ""}'
+        )
+    return "<html><head>" + noise + "</head><body><div id=\"links\">" + "".join(rows) + "</div></body></html>"
+
+
+# 🔎 Early-exit HTMLParser extractor vs the full BeautifulSoup tree
+def bench_search_extract(args):
+    from resource_suggester import parse_youtube_links, extract_youtube_links
+
+    pages = {
+        "ddg page, hits spread": _realistic_results_page(30),
+        "ddg page, no hits": _realistic_results_page(30, youtube_at=()),
+        "ddg page x10, hits late": _realistic_results_page(300, youtube_at=(250, 270, 290)),
+    }
+    rows = []
+    for label, page in pages.items():
+        # Same first hit; the extractor also drops the duplicate title/URL anchors bs4 returns
+        assert extract_youtube_links(page)[:1] == parse_youtube_links(page)[:1]
+        rows.append((f"bs4 {label}", *timeit(lambda: parse_youtube_links(page), 20)))
+        rows.append((f"extractor {label}", *timeit(lambda: extract_youtube_links(page), 20)))
+    report(rows)
+
+
+# 🩺 Cost of the tracing decorator, disabled and enabled
+def bench_tracing(args):
+    import tracing
+
+    def plain(x):
+        return x
+
+    wrapped = tracing.traced("bench.noop")(plain)
+    n = 100_000
+    was_enabled = tracing.ENABLED
+    try:
+        tracing.enable(False)
+        rows = [("plain call x100k", *timeit(lambda: [plain(i) for i in range(n)], repeat=5))]
+        rows.append(("traced, disabled x100k", *timeit(lambda: [wrapped(i) for i in range(n)], repeat=5)))
+        tracing.enable(True)
+        rows.append(("traced, enabled x100k", *timeit(lambda: [wrapped(i) for i in range(n)], repeat=5)))
+    finally:
+        tracing.enable(was_enabled)
+    report(rows)
+
+
+# 🧠 StudyBot near-duplicate lookup against a full answer cache
+def bench_answer_cache(args):
+    from answer_cache import AnswerCache
+
+    cache = AnswerCache()
+    for i in range(cache.max_entries):
+        cache.put(f"question {i} about topic {i % 37} and concept {i % 11}", f"answer {i}")
+    report([
+        ("lookup, full cache (miss)", *timeit(lambda: cache.lookup("what is bernoulli theorem"), repeat=200)),
+        ("lookup, full cache (hit)", *timeit(lambda: cache.lookup("question 7 about topic 7 and concept 7"), repeat=200)),
+    ])
+    failures = check_answer_cache()
+    for failure in failures:
+        print(f"  ❌ {failure}")
+    if failures:
+        sys.exit(1)
+    print("  ✅ paraphrases hit, questions with different numbers or math miss")
+
+
+# 🧪 Which rephrasings may share a cached answer; returns what broke
+def check_answer_cache():
+    from answer_cache import AnswerCache
+
+    cases = [
+        ("what is bernoulli theorem", "explain bernoulli's theorem", True),
+        ("what is photosynthesis", "explain photosynthesis in simple terms", True),
+        ("practice problems for trigonometry class 10", "practice problems for class 10 trigonometry", True),
+        ("solve the quadratic equation x^2 + 5x + 6 = 0", "solve the quadratic equation x^2 + 5x + 7 = 0", False),
+        ("practice problems for trigonometry class 10", "practice problems for trigonometry class 11", False),
+        ("what is newton's first law", "what is newton's second law", False),
+        ("how does photosynthesis work", "how does respiration work", False),
+    ]
+    failures = []
+    for stored, asked, should_hit in cases:
+        cache = AnswerCache(max_entries=4)
+        cache.put(stored, "answer")
+        if (cache.lookup(asked) is not None) != should_hit:
+            failures.append(f"answer cache: {asked!r} after {stored!r} should {'hit' if should_hit else 'miss'}")
+    cache.clear()
+    stats = cache.stats()
+    if stats["hits"] or stats["misses"] or stats["evictions"]:
+        failures.append(f"answer cache: clear() kept the old counters {stats}")
+    return failures
+
+
+def _synthetic_dag(n, seed=11, window=200, max_prereqs=2):
+    import random
+    rng = random.Random(seed)
+    topics = [f"Topic {i}" for i in range(n)]
+    efforts = {t: rng.choice([1, 2, 3, 5, 8]) for t in topics}
+    prereqs = {}
+    for i in range(1, n):
+        if rng.random() < 0.7:
+            prereqs[topics[i]] = [topics[j] for j in rng.sample(range(max(i - window, 0), i), min(i, max_prereqs))]
+    return topics, efforts, prereqs
+
+
+# 📐 Dependency-aware scheduling at thousands of topics / hundreds of weeks
+def bench_scheduler(args):
+    from scheduler import schedule, replan, validate, week_loads
+
+    rows = []
+    for n, weeks in [(100, 12), (1_000, 52), (5_000, 300), (10_000, 500)]:
+        topics, efforts, prereqs = _synthetic_dag(n)
+        rows.append((f"schedule {n} topics / {weeks} weeks", *timeit(lambda: schedule(topics, weeks, efforts, prereqs), repeat=3)))
+        plan = schedule(topics, weeks, efforts, prereqs)
+        assert validate(plan, prereqs), "schedule violated a prerequisite"
+        loads = list(week_loads(plan, efforts).values())
+        done = set(topics[: n // 3])
+        rows.append((f"replan after {len(done)} done", *timeit(lambda: replan(plan, done, weeks // 2, efforts, prereqs), repeat=3)))
+        print(f"  {n} topics: max weekly load {max(loads):.0f} vs ideal {sum(loads) / weeks:.1f}")
+    report(rows)
+
+
+def compare_to_baseline(path, threshold, min_delta):
+    with open(path, "r") as f:
+        baseline = json.load(f)
+    regressions = []
+    for name, result in RESULTS.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        # Best-of-N is far less noisy than the median on a shared machine
+        delta = result["best"] - before["best"]
+        # Tiny absolute differences are timer noise, not regressions
+        if delta > min_delta and result["best"] > before["best"] * (1 + threshold):
+            regressions.append((name, before["best"], result["best"]))
+    for name, before, after in regressions:
+        print(f"❌ regression {name}: {before * 1000:.3f} ms -> {after * 1000:.3f} ms ({after / before:.2f}x)")
+    if not regressions:
+        print(f"✅ no regressions beyond {threshold:.0%} against {os.path.basename(path)}")
+    return regressions
+
+
+BENCHMARKS = {
+    "startup": bench_startup,
+    "gateway": bench_gateway,
+    "routing": bench_routing,
+    "export": bench_export,
+    "resource_index": bench_resource_index,
+    "answer_cache": bench_answer_cache,
+    "hotpaths": bench_hotpaths,
+    "search_extract": bench_search_extract,
+    "tracing": bench_tracing,
+    "scheduler": bench_scheduler,
+}
+
+
+def main():
+    global _current
+    parser = argparse.ArgumentParser(description="PathPlanner.AI benchmarks")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default: all): " + ", ".join(BENCHMARKS))
+    parser.add_argument("--max-size", type=int, default=100_000, help="largest synthetic input for hotpaths (up to 1000000)")
+    parser.add_argument("--max-html-size", type=int, default=10_000, help="largest results page for link parsing")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="baseline results file")
+    parser.add_argument("--save-baseline", action="store_true", help="write this run's results to --baseline")
+    parser.add_argument("--compare", action="store_true", help="fail if any result regressed past --threshold")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(unknown)}")
+    for name in args.names or list(BENCHMARKS):
+        _current = name
+        print(f"== {name} ==")
+        BENCHMARKS[name](args)
+
+    if args.compare:
+        if not os.path.exists(args.baseline):
+            parser.error(f"no baseline at {args.baseline}; run with --save-baseline first")
+        if compare_to_baseline(args.baseline, args.threshold, args.min_delta_ms / 1000):
+            sys.exit(1)
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline, "r") as f:
+                baseline = json.load(f)
+        baseline.update(RESULTS)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"💾 saved {len(RESULTS)} results to {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
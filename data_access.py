@@ -0,0 +1,41 @@
+import json
+import os
+import threading
+
+_cache = {}
+_lock = threading.Lock()
+stats = {"hits": 0, "reloads": 0}
+
+
+def _signature(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+# 📂 Parsed JSON kept in memory; re-read only when the file's mtime or size changes
+def load_json(path):
+    signature = _signature(path)
+    with _lock:
+        entry = _cache.get(path)
+        if entry is not None and entry[0] == signature:
+            stats["hits"] += 1
+            return entry[1]
+    with open(path, "r") as f:
+        data = json.load(f)
+    with _lock:
+        _cache[path] = (signature, data)
+        stats["reloads"] += 1
+    return data
+
+
+def get_skills(path="skills_db.json"):
+    return load_json(path)
+
+
+def get_resources(path="resources_db.json"):
+    return load_json(path)
+
+
+def clear():
+    with _lock:
+        _cache.clear()
@@ -1,10 +1,276 @@
-import pdfkit
+import html
+import io
+import textwrap
+import uuid
+import zlib
+from datetime import date, datetime, timedelta, timezone
 
-def save_roadmap_as_pdf(roadmap, filename="study_plan.pdf"):
-    html = "<h1>PathPlanner.AI – Your Study Roadmap</h1>"
+from tracing import traced
+
+TITLE = "PathPlanner.AI – Your Study Roadmap"
+FORMATS = {
+    "markdown": ("md", "text/markdown"),
+    "html": ("html", "text/html"),
+    "ical": ("ics", "text/calendar"),
+    "pdf": ("pdf", "application/pdf"),
+}
+
+
+# 📝 Markdown
+def render_markdown(roadmap, title=TITLE):
+    parts = [f"# {title}\n"]
+    for week, topics in roadmap.items():
+        parts.append(f"\n## {week}\n\n")
+        parts.extend(f"- {t}\n" for t in topics)
+    return "".join(parts)
+
+
+# 🌐 HTML
+def render_html(roadmap, title=TITLE):
+    parts = [f"<h1>{html.escape(title)}</h1>"]
+    for week, topics in roadmap.items():
+        parts.append(f"<h2>{html.escape(week)}</h2><ul>")
+        parts.extend(f"<li>{html.escape(str(t))}</li>" for t in topics)
+        parts.append("</ul>")
+    return "".join(parts)
+
+
+def _ical_escape(text):
+    return str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,").replace("\n", "\\n")
+
+
+# 📅 iCalendar: one all-day, week-long event per roadmap week
+def render_ical(roadmap, start=None, title=TITLE):
+    start = start or date.today()
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//PathPlanner.AI//Roadmap//EN", "CALSCALE:GREGORIAN"]
+    for i, (week, topics) in enumerate(roadmap.items()):
+        week_start = start + timedelta(weeks=i)
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{uuid.uuid4()}@pathplanner.ai",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART;VALUE=DATE:{week_start:%Y%m%d}",
+            f"DTEND;VALUE=DATE:{week_start + timedelta(days=7):%Y%m%d}",
+            f"SUMMARY:{_ical_escape(week)}",
+            f"DESCRIPTION:{_ical_escape(chr(10).join(str(t) for t in topics))}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(lines) + "\r\n"
+
+
+# 📄 Minimal text-only PDF writer. Built-in Helvetica covers cp1252; anything else (Hindi,
+# Chinese, ...) is drawn with a subset of a system TrueType font, see pdf_fonts.
+PAGE_WIDTH, PAGE_HEIGHT, MARGIN = 595, 842, 56
+STYLES = {"title": ("F2", 18, 28), "week": ("F2", 14, 22), "item": ("F1", 11, 15)}
+
+
+def _pdf_text(text):
+    raw = str(text).encode("cp1252", errors="replace")
+    return raw.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)")
+
+
+def _cp1252(text):
+    try:
+        text.encode("cp1252")
+    except UnicodeEncodeError:
+        return False
+    return True
+
+
+# Splits a line into (font index or None for Helvetica, text) runs; records the glyphs
+# each fallback font has to carry in used[index] = {glyph: char}
+def _runs(text, used):
+    text = str(text)
+    if _cp1252(text):
+        return [(None, text)]
+    runs = []
+    for char in text:
+        index = None
+        if not _cp1252(char):
+            from pdf_fonts import fallback_fonts
+            for i, font in enumerate(fallback_fonts()):
+                if ord(char) in font.cmap:
+                    index = i
+                    used.setdefault(i, {})[font.cmap[ord(char)]] = char
+                    break
+        if runs and runs[-1][0] == index:
+            runs[-1][1].append(char)
+        else:
+            runs.append((index, [char]))
+    return [(index, "".join(chars)) for index, chars in runs]
+
+
+def _text_ops(style, text, y, used):
+    font, size, _ = STYLES[style]
+    ops = [b"BT %d %d Td" % (MARGIN, y)]
+    for index, run in _runs(text, used):
+        if index is None:
+            ops.append(b"/%s %d Tf (%s) Tj" % (font.encode(), size, _pdf_text(run)))
+        else:
+            from pdf_fonts import fallback_fonts
+            cmap = fallback_fonts()[index].cmap
+            glyphs = "".join("%04X" % cmap[ord(c)] for c in run)
+            ops.append(b"/U%d %d Tf <%s> Tj" % (index, size, glyphs.encode()))
+    ops.append(b"ET")
+    return b" ".join(ops)
+
+
+def _to_unicode(glyphs):
+    entries = sorted(glyphs.items())
+    lines = [
+        "/CIDInit /ProcSet findresource begin", "12 dict begin", "begincmap",
+        "/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        "/CMapName /Adobe-Identity-UCS def", "/CMapType 2 def",
+        "1 begincodespacerange", "<0000> <FFFF>", "endcodespacerange",
+    ]
+    for i in range(0, len(entries), 100):
+        block = entries[i:i + 100]
+        lines.append(f"{len(block)} beginbfchar")
+        lines.extend(f"<{glyph:04X}> <{char.encode('utf-16-be').hex().upper()}>" for glyph, char in block)
+        lines.append("endbfchar")
+    lines += ["endcmap", "CMapName currentdict /CMap defineresource pop", "end", "end"]
+    return "\n".join(lines).encode("ascii")
+
+
+def _stream(data, extra=b""):
+    return b"<< /Length %d%s >>\nstream\n%s\nendstream" % (len(data), extra, data)
+
+
+# Type0 font over an embedded TrueType subset, addressed by glyph id (Identity-H)
+def _embed_font(add, font, glyphs, index):
+    scale = 1000 / font.units_per_em
+    name = f"PPLAN{chr(65 + index % 26)}+{font.name}"
+    data = font.subset(glyphs)
+    file_ref = add(_stream(zlib.compress(data), b" /Filter /FlateDecode /Length1 %d" % len(data)))
+    bbox = " ".join(str(round(v * scale)) for v in font.bbox)
+    descriptor = add(
+        f"<< /Type /FontDescriptor /FontName /{name} /Flags 32 /FontBBox [{bbox}] /ItalicAngle 0 "
+        f"/Ascent {round(font.ascent * scale)} /Descent {round(font.descent * scale)} "
+        f"/CapHeight {round(font.ascent * scale)} /StemV 80 /FontFile2 {file_ref} 0 R >>".encode()
+    )
+    widths = " ".join(f"{g} [{round(font.advance(g) * scale)}]" for g in sorted(glyphs))
+    cid_font = add(
+        f"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /{name} "
+        f"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) /Supplement 0 >> "
+        f"/FontDescriptor {descriptor} 0 R /W [{widths}] /CIDToGIDMap /Identity >>".encode()
+    )
+    to_unicode = add(_stream(_to_unicode(glyphs)))
+    return add(
+        f"<< /Type /Font /Subtype /Type0 /BaseFont /{name} /Encoding /Identity-H "
+        f"/DescendantFonts [{cid_font} 0 R] /ToUnicode {to_unicode} 0 R >>".encode()
+    )
+
+
+def _layout(roadmap, title):
+    lines = [("title", title)]
     for week, topics in roadmap.items():
-        html += f"<h2>{week}</h2><ul>"
+        lines.append(("week", week))
         for t in topics:
-            html += f"<li>{t}</li>"
-        html += "</ul>"
-    pdfkit.from_string(html, filename)
+            wrapped = textwrap.wrap(str(t), 85) or [""]
+            lines.append(("item", "\u2022 " + wrapped[0]))
+            lines.extend(("item", "   " + rest) for rest in wrapped[1:])
+    pages, page, y = [], [], PAGE_HEIGHT - MARGIN
+    for style, text in lines:
+        leading = STYLES[style][2]
+        if y - leading < MARGIN and page:
+            pages.append(page)
+            page, y = [], PAGE_HEIGHT - MARGIN
+        y -= leading
+        page.append((style, text, y))
+    pages.append(page)
+    return pages
+
+
+def render_pdf(roadmap, title=TITLE):
+    return render_pdf_document([roadmap], title)
+
+
+# One document; each roadmap starts on a new page
+def render_pdf_document(roadmaps, title=TITLE):
+    pages = [page for roadmap in roadmaps for page in _layout(roadmap, title)]
+    # 1 catalog and 2 page tree are written last, once the page objects are numbered
+    objects = [None, None]
+
+    def add(body):
+        objects.append(body)
+        return len(objects)
+
+    used = {}
+    contents = [b"\n".join(_text_ops(style, text, y, used) for style, text, y in page) for page in pages]
+    fonts = {
+        "F1": add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>"),
+        "F2": add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>"),
+    }
+    if used:
+        from pdf_fonts import fallback_fonts
+        for index, glyphs in sorted(used.items()):
+            fonts[f"U{index}"] = _embed_font(add, fallback_fonts()[index], glyphs, index)
+    font_refs = " ".join(f"/{key} {ref} 0 R" for key, ref in fonts.items())
+    kids = []
+    for content in contents:
+        content_ref = add(_stream(content))
+        kids.append(add(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << {font_refs} >> >> /Contents {content_ref} 0 R >>".encode()
+        ))
+    objects[0] = b"<< /Type /Catalog /Pages 2 0 R >>"
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(f'{k} 0 R' for k in kids)}] /Count {len(kids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(out.tell())
+        out.write(b"%d 0 obj\n%s\nendobj\n" % (number, body))
+    xref = out.tell()
+    out.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+    out.write(b"".join(b"%010d 00000 n \n" % off for off in offsets))
+    out.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref))
+    return out.getvalue()
+
+
+RENDERERS = {
+    "markdown": render_markdown,
+    "html": render_html,
+    "ical": render_ical,
+    "pdf": render_pdf,
+}
+
+
+@traced()
+def export_roadmap(roadmap, fmt="pdf", title=TITLE):
+    data = RENDERERS[fmt](roadmap, title=title)
+    return data if isinstance(data, bytes) else data.encode("utf-8")
+
+
+# 📦 Render many roadmaps in one pass; write them to a stream or get the bytes back.
+# PDFs cannot be concatenated, so a PDF stream gets one document with a page run per roadmap.
+@traced()
+def export_roadmaps(roadmaps, fmt="pdf", stream=None, title=TITLE):
+    if fmt == "pdf" and stream is not None:
+        stream.write(render_pdf_document(list(roadmaps), title=title))
+        return []
+    render = RENDERERS[fmt]
+    results = []
+    for roadmap in roadmaps:
+        data = render(roadmap, title=title)
+        if not isinstance(data, bytes):
+            data = data.encode("utf-8")
+        if stream is not None:
+            stream.write(data)
+        else:
+            results.append(data)
+    return results
+
+
+@traced()
+def save_roadmap_as_pdf(roadmap, filename="study_plan.pdf"):
+    data = render_pdf(roadmap)
+    if hasattr(filename, "write"):
+        filename.write(data)
+    else:
+        with open(filename, "wb") as f:
+            f.write(data)
+    return data
@@ -0,0 +1,394 @@
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# 🧪 Local stand-ins for the external services PathPlanner.AI talks to, for offline runs
+
+
+def ddg_results_page(query, n_results=10):
+    rows = []
+    for i in range(n_results):
+        rows.append(
+            f'<div class="result"><a class="result__a" href="https://www.youtube.com/watch?v=stub{i:04d}">'
+            f'{query} - lecture {i + 1}</a>'
+            f'<a class="result__url" href="https://example.com/{i}">example.com</a></div>'
+        )
+    return (
+        "<html><head><title>DuckDuckGo</title></head><body><div id=\"links\">"
+        + "".join(rows)
+        + "</div></body></html>"
+    )
+
+
+# 🗣️ What a small model sometimes does instead of following the JSON instructions
+PROSE_ANSWER = "Sure! Here is a plan you could follow, starting with the basics and building up from there."
+
+
+# Per-model speed and quality: {"name": {"latency": s, "token_delay": s, "prose_rate": 0-1,
+# "load_time": s}}. Models without an entry use the stand-in's own defaults.
+def _profile(stub, model):
+    profile = stub.models.get(model, {})
+    return (profile.get("latency", stub.latency), profile.get("token_delay", stub.token_delay),
+            profile.get("prose_rate", 0.0), profile.get("load_time", stub.load_time))
+
+
+# Ollama's keep_alive: a number of seconds, or a Go duration string such as "30m" or "1h30m"
+# (a unit is required, so "-1" is rejected); negative keeps the model loaded
+DURATION_UNITS = {"ns": 1e-9, "us": 1e-6, "µs": 1e-6, "ms": 1e-3, "s": 1, "m": 60, "h": 3600}
+
+
+def keep_alive_seconds(value, default=300.0):
+    if value is None:
+        return default
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        seconds = float(value)
+    else:
+        text = str(value)
+        part = r"(\d+(?:\.\d*)?|\.\d+)(ns|us|µs|ms|s|m|h)"
+        if text.lstrip("+-") == "0":
+            seconds = 0.0
+        elif re.fullmatch(rf"[+-]?(?:{part})+", text):
+            seconds = sum(float(n) * DURATION_UNITS[u] for n, u in re.findall(part, text))
+            seconds = -seconds if text.startswith("-") else seconds
+        elif re.fullmatch(r"[+-]?(\d+(?:\.\d*)?|\.\d+)", text):
+            raise ValueError(f'time: missing unit in duration "{text}"')
+        else:
+            raise ValueError(f'time: invalid duration "{text}"')
+    return float("inf") if seconds < 0 else seconds
+
+
+# ⏳ A model idle past its keep_alive is unloaded; the next call waits load_time for it
+# (calls arriving mid-load wait for the same load). Returns the seconds waited; an invalid
+# keep_alive raises ValueError before anything is loaded, as Ollama rejects the request.
+def _load(stub, model, keep_alive, load_time):
+    keep_alive = keep_alive_seconds(keep_alive)
+    with stub._lock:
+        now = time.monotonic()
+        ready_at, until = stub._loaded.get(model, (0.0, 0.0))
+        if now >= until:
+            ready_at = now + load_time
+            if load_time:
+                stub.loads[model] = stub.loads.get(model, 0) + 1
+        stub._loaded[model] = (ready_at, max(ready_at, now) + keep_alive)
+    wait = max(ready_at - now, 0.0)
+    if wait:
+        time.sleep(wait)
+    return wait
+
+
+def _respond(stub, model, messages, prose_rate, structured=False):
+    text = stub.responder(model, messages)
+    if prose_rate and text.startswith("{") and random.random() < prose_rate:
+        # With a format the reply is still JSON, just not the shape that was asked for
+        return json.dumps({"answer": PROSE_ANSWER}) if structured else PROSE_ANSWER
+    return text
+
+
+def _counts(messages, text, loaded):
+    return {"prompt_eval_count": sum(len(m.get("content", "")) // 4 + 1 for m in messages),
+            "eval_count": len(text.split(" ")) if text else 0, "load_duration": int(loaded * 1e9)}
+
+
+# 🤖 In-process Ollama stand-in with the same chat() signature as the ollama package
+class FakeOllama:
+    def __init__(self, latency=0.2, token_delay=0.0, responder=None, models=None, load_time=0.0):
+        self.latency = latency
+        self.token_delay = token_delay
+        self.load_time = load_time
+        self.responder = responder or self.default_response
+        self.models = dict(models or {})
+        self.calls = 0
+        self.calls_by_model = {}
+        self.loads = {}
+        self._loaded = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def default_response(model, messages):
+        # The original request, also when a correction follows it
+        prompt = next(m["content"] for m in messages if m["role"] == "user")
+        if "Interpret this learning goal" in prompt:
+            return '{"tracks": ["general"], "topics": ["Basics", "Core Concepts", "Practice", "Revision"]}'
+        if "Break down the topic" in prompt:
+            match = re.search(r"roadmap for (\d+) weeks", prompt)
+            weeks = int(match.group(1)) if match else 2
+            return json.dumps({f"Week {i}": [f"Part {i}.1", f"Part {i}.2"] for i in range(1, weeks + 1)})
+        return "Here is a clear explanation of your question."
+
+    def chat(self, model, messages, stream=False, keep_alive=None, format=None, **kwargs):
+        latency, token_delay, prose_rate, load_time = _profile(self, model)
+        with self._lock:
+            self.calls += 1
+            self.calls_by_model[model] = self.calls_by_model.get(model, 0) + 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            loaded = _load(self, model, keep_alive, load_time)
+            # An empty chat only loads the model, as Ollama does
+            if messages:
+                time.sleep(latency)
+            text = _respond(self, model, messages, prose_rate, format is not None) if messages else ""
+        except BaseException:
+            with self._lock:
+                self.active -= 1
+            raise
+        counts = _counts(messages, text, loaded)
+        if stream:
+            return self._stream(model, text, token_delay, counts)
+        with self._lock:
+            self.active -= 1
+        return {"model": model, "message": {"role": "assistant", "content": text}, "done": True, **counts}
+
+    def _stream(self, model, text, token_delay, counts):
+        try:
+            for token in text.split(" "):
+                if token_delay:
+                    time.sleep(token_delay)
+                yield {"model": model, "message": {"role": "assistant", "content": token + " "}, "done": False}
+            yield {"model": model, "message": {"role": "assistant", "content": ""}, "done": True, **counts}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+class _DuckDuckGoHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get("q", [""])[0]
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        body = ddg_results_page(query, self.server.n_results).encode("utf-8")
+        self.server.hits += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 🦆 DuckDuckGo HTML results stub; point resource_suggester.SEARCH_URL at .url
+class DuckDuckGoStub:
+    def __init__(self, host="127.0.0.1", port=0, delay=0.0, n_results=10):
+        self.server = ThreadingHTTPServer((host, port), _DuckDuckGoHandler)
+        self.server.daemon_threads = True
+        self.server.delay = delay
+        self.server.n_results = n_results
+        self.server.hits = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/html/"
+
+    @property
+    def hits(self):
+        return self.server.hits
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class _OllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def _send_json(self, status, obj):
+        body = json.dumps(obj).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _write_chunk(self, obj):
+        data = (json.dumps(obj) + "\n").encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def do_GET(self):
+        if self.path.startswith("/api/tags"):
+            self._send_json(200, {"models": [{"name": name} for name in self.server.stub.model_names]})
+        elif self.path.startswith("/api/version"):
+            self._send_json(200, {"version": "0.0.0-stub"})
+        else:
+            self._send_json(404, {"error": "not found"})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if not self.path.startswith("/api/chat"):
+            self._send_json(404, {"error": "not found"})
+            return
+        stub = self.server.stub
+        stub._enter()
+        try:
+            self._chat(stub, request)
+        finally:
+            stub._leave()
+
+    def _chat(self, stub, request):
+        model = request.get("model", "")
+        messages = request.get("messages", [])
+        latency, token_delay, prose_rate, load_time = _profile(stub, model)
+        stub._count(model)
+        try:
+            loaded = _load(stub, model, request.get("keep_alive"), load_time)
+        except ValueError as e:
+            self._send_json(400, {"error": str(e)})
+            return
+        if not messages:
+            # An empty chat only loads the model
+            self._send_json(200, {"model": model, "message": {"role": "assistant", "content": ""}, "done": True,
+                                  "done_reason": "load", **_counts(messages, "", loaded)})
+            return
+        time.sleep(latency)
+        if stub.error_rate and random.random() < stub.error_rate:
+            self._send_json(500, {"error": "injected failure"})
+            return
+        text = _respond(stub, model, messages, prose_rate, request.get("format") is not None)
+        tokens = [t + " " for t in text.split(" ")]
+        final = {"model": model, "message": {"role": "assistant", "content": ""}, "done": True,
+                 "done_reason": "stop", **_counts(messages, text, loaded)}
+        if not request.get("stream", True):
+            time.sleep(len(tokens) * token_delay)
+            final["message"]["content"] = "".join(tokens)
+            self._send_json(200, final)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for token in tokens:
+            if token_delay:
+                time.sleep(token_delay)
+            self._write_chunk({"model": model, "message": {"role": "assistant", "content": token}, "done": False})
+        self._write_chunk(final)
+        self.wfile.write(b"0\r\n\r\n")
+
+    def log_message(self, format, *args):
+        pass
+
+
+# 🦙 Ollama HTTP stand-in (/api/chat, streaming or not) with a fixed time to first
+# token and a steady token rate; point ollama.Client(host=...) at .url.
+# models may be a list of names, or {"name": {"latency": s, "tokens_per_sec": n, "prose_rate": 0-1,
+# "load_time": s}} to serve several models at different speeds.
+class OllamaStub:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.5, tokens_per_sec=50.0, error_rate=0.0,
+                 responder=None, models=("mistral:instruct",), load_time=0.0):
+        self.latency = latency
+        self.token_delay = 1.0 / tokens_per_sec if tokens_per_sec else 0.0
+        self.load_time = load_time
+        self.error_rate = error_rate
+        self.responder = responder or FakeOllama.default_response
+        profiles = models if isinstance(models, dict) else {name: {} for name in models}
+        self.model_names = list(profiles)
+        self.models = {}
+        for name, profile in profiles.items():
+            profile = dict(profile)
+            if "tokens_per_sec" in profile:
+                rate = profile.pop("tokens_per_sec")
+                profile["token_delay"] = 1.0 / rate if rate else 0.0
+            self.models[name] = profile
+        self.requests = 0
+        self.requests_by_model = {}
+        self.loads = {}
+        self._loaded = {}
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), _OllamaHandler)
+        self.server.daemon_threads = True
+        self.server.stub = self
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def _enter(self):
+        with self._lock:
+            self.requests += 1
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+
+    def _count(self, model):
+        with self._lock:
+            self.requests_by_model[model] = self.requests_by_model.get(model, 0) + 1
+
+    def _leave(self):
+        with self._lock:
+            self.active -= 1
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local stand-ins for external services")
+    parser.add_argument("service", choices=["ddg", "ollama"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="ddg: response delay; ollama: time to first token")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="ollama: streaming token rate")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="ollama: fraction of calls that fail")
+    parser.add_argument("--load-time", type=float, default=0.0, help="ollama: model load time after keep_alive expires")
+    parser.add_argument("--model", action="append", default=[], metavar="NAME=LATENCY,TOKENS_PER_SEC",
+                        help="ollama: serve this model at its own speed (repeatable)")
+    args = parser.parse_args()
+
+    if args.service == "ollama":
+        models = {"mistral:instruct": {}}
+        for spec in args.model:
+            name, _, speed = spec.partition("=")
+            latency, _, rate = speed.partition(",")
+            profile = {"latency": float(latency)} if latency else {}
+            if rate:
+                profile["tokens_per_sec"] = float(rate)
+            models[name] = profile
+        stub = OllamaStub(port=args.port, latency=args.delay, tokens_per_sec=args.tokens_per_sec,
+                          error_rate=args.error_rate, models=models, load_time=args.load_time).start()
+    else:
+        stub = DuckDuckGoStub(port=args.port, delay=args.delay).start()
+    print(f"Serving {args.service} stub at {stub.url} (Ctrl+C to stop)")
+    try:
+        stub.thread.join()
+    except KeyboardInterrupt:
+        stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+import math
+import re
+import threading
+
+from data_access import load_json
+from tracing import traced
+
+CONFIDENCE_THRESHOLD = 0.75
+NAME_WEIGHT = 1.0
+TOPIC_WEIGHT = 0.4
+
+# Extra ways people name the tracks in skills_db.json
+ALIASES = {
+    "class 9": ["class ix", "9th", "ninth", "cbse 9"],
+    "class 10": ["class x", "10th", "tenth", "cbse 10", "cbse", "board exam", "ssc"],
+    "class 11": ["class xi", "11th", "eleventh", "cbse 11"],
+    "class 12": ["class xii", "12th", "twelfth", "cbse 12", "hsc"],
+    "gate": ["gate cs", "gate cse", "gate exam", "gate computer science"],
+    "machine learning": ["ml", "deep learning", "ai ml", "data science"],
+}
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "for", "in", "on", "to", "my", "i", "want", "learn", "learning",
+    "master", "crack", "clear", "prepare", "preparation", "pass", "study", "exam", "exams", "course",
+    "complete", "full", "syllabus", "get", "good", "at", "with", "how", "score", "marks",
+}
+# "learning" is a stopword in goals, but not inside a track name like "machine learning"
+NAME_TOKENS_KEEP = {"learning", "exam"}
+
+
+def tokenize(text, keep=()):
+    text = str(text).lower()
+    text = re.sub(r"\b(\d+)(st|nd|rd|th)\b", r"\1", text)
+    tokens = re.findall(r"[a-z]+|\d+", text)
+    return [
+        t for t in tokens
+        if (t not in STOPWORDS or t in keep) and not re.fullmatch(r"(19|20)\d\d", t)
+    ]
+
+
+class GoalMatch:
+    def __init__(self, track, topics, confidence):
+        self.track = track
+        self.topics = topics
+        self.confidence = confidence
+
+    def __repr__(self):
+        return f"GoalMatch(track={self.track!r}, confidence={self.confidence:.2f})"
+
+
+# 🗂️ Inverted index: token -> {track: weight} over track names, aliases and topic lists
+class GoalMatcher:
+    def __init__(self, skills_db, aliases=ALIASES):
+        self.skills_db = skills_db
+        self.aliases = aliases
+        self.postings = {}
+        for track, topics in skills_db.items():
+            if track == "general":
+                continue
+            for token in tokenize(track, NAME_TOKENS_KEEP):
+                self._add(token, track, NAME_WEIGHT)
+            for alias in aliases.get(track, []):
+                for token in tokenize(alias, NAME_TOKENS_KEEP):
+                    self._add(token, track, NAME_WEIGHT)
+            for topic in topics:
+                for token in tokenize(topic):
+                    self._add(token, track, TOPIC_WEIGHT)
+        n_tracks = max(len(skills_db) - ("general" in skills_db), 1)
+        self.idf = {
+            token: math.log(1 + n_tracks / len(tracks)) for token, tracks in self.postings.items()
+        }
+        self.unknown_idf = math.log(1 + n_tracks)
+        self.lookups = 0
+        self.hits = 0
+
+    def _add(self, token, track, weight):
+        tracks = self.postings.setdefault(token, {})
+        tracks[track] = max(tracks.get(track, 0.0), weight)
+
+    def match(self, goal):
+        tokens = set(tokenize(goal))
+        if not tokens:
+            return None
+        scores = {}
+        total = 0.0
+        for token in tokens:
+            idf = self.idf.get(token, self.unknown_idf)
+            total += idf
+            for track, weight in self.postings.get(token, {}).items():
+                scores[track] = scores.get(track, 0.0) + idf * weight
+        if not scores:
+            return None
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best_track, best = ranked[0]
+        confidence = best / total
+        # Two tracks explaining the goal equally well is not a confident answer
+        if len(ranked) > 1 and ranked[1][1] >= best * 0.95:
+            confidence *= 0.5
+        return GoalMatch(best_track, self.skills_db[best_track], round(confidence, 3))
+
+    # Whether the goal spells out the track's name or an alias as whole words, however little of
+    # the rest of the goal the track explains ("Crack GATE Mechanical Engineering" names gate)
+    def names(self, goal, track):
+        tokens = set(tokenize(goal, NAME_TOKENS_KEEP))
+        return any(
+            set(tokenize(name, NAME_TOKENS_KEEP)) <= tokens
+            for name in [track, *self.aliases.get(track, [])]
+        )
+
+    @traced("goal_matcher.resolve")
+    def resolve(self, goal, threshold=CONFIDENCE_THRESHOLD):
+        self.lookups += 1
+        match = self.match(goal)
+        if match is not None and match.confidence >= threshold:
+            self.hits += 1
+            return match
+        return None
+
+    def stats(self):
+        return {
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_rate": round(self.hits / self.lookups, 3) if self.lookups else 0.0,
+        }
+
+
+_matcher = None
+_matcher_source = None
+_matcher_lock = threading.Lock()
+
+
+def get_goal_matcher(path="skills_db.json"):
+    global _matcher, _matcher_source
+    skills_db = load_json(path)
+    with _matcher_lock:
+        if _matcher is None or _matcher_source is not skills_db:
+            _matcher = GoalMatcher(skills_db)
+            _matcher_source = skills_db
+        return _matcher
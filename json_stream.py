@@ -0,0 +1,58 @@
+import json
+
+
+# 🧩 Incremental parser that emits top-level "key": value pairs of a JSON object as soon as each one closes
+class ObjectStreamParser:
+    def __init__(self):
+        self.buffer = ""
+        self.pos = 0
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+        self.started = False
+        self.done = False
+        self.member_start = None
+
+    def feed(self, chunk):
+        self.buffer += chunk
+        members = []
+        buf = self.buffer
+        i = self.pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif ch == "\\":
+                    self.escaped = True
+                elif ch == '"':
+                    self.in_string = False
+            elif not self.started:
+                # Skip any prose the model writes before the opening brace
+                if ch == "{":
+                    self.started = True
+                    self.depth = 1
+                    self.member_start = i + 1
+            elif ch == '"':
+                self.in_string = True
+            elif ch in "{[":
+                self.depth += 1
+            elif ch in "}]":
+                self.depth -= 1
+                if self.depth == 0:
+                    members.extend(self._close_member(buf[self.member_start:i]))
+                    self.done = True
+            elif ch == "," and self.depth == 1:
+                members.extend(self._close_member(buf[self.member_start:i]))
+                self.member_start = i + 1
+            i += 1
+        self.pos = i
+        return members
+
+    def _close_member(self, text):
+        if not text.strip():
+            return []
+        try:
+            return list(json.loads("{" + text + "}").items())
+        except ValueError:
+            return []
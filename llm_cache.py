@@ -0,0 +1,133 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+
+CACHE_PATH = os.environ.get("PATHPLANNER_LLM_CACHE", "llm_cache.db")
+MAX_ENTRIES = int(os.environ.get("PATHPLANNER_LLM_CACHE_MAX", "2000"))
+TTL_SECONDS = int(os.environ.get("PATHPLANNER_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+BYPASS = os.environ.get("PATHPLANNER_LLM_CACHE_BYPASS", "") not in ("", "0", "false")
+
+
+def normalize_prompt(prompt):
+    # Indentation and case differences in the prompt template should not split the cache
+    return re.sub(r"\s+", " ", prompt).strip().lower()
+
+
+def make_key(model, prompt, params=None):
+    payload = json.dumps(
+        {"model": model, "prompt": normalize_prompt(prompt), "params": params or {}},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# 🗄️ Disk-backed LRU cache for parsed LLM results
+class LLMCache:
+    def __init__(self, path=CACHE_PATH, max_entries=MAX_ENTRIES, ttl=TTL_SECONDS):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.bypass = BYPASS
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                model TEXT,
+                value TEXT,
+                created REAL,
+                last_used REAL
+            )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON llm_cache(last_used)")
+        self._conn.commit()
+
+    def get(self, model, prompt, params=None):
+        return self.get_any([model], prompt, params)
+
+    # One lookup across several models' entries (e.g. every model on a route), counted once
+    def get_any(self, models, prompt, params=None):
+        if self.bypass:
+            return None
+        now = time.time()
+        with self._lock:
+            for model in models:
+                key = make_key(model, prompt, params)
+                row = self._conn.execute(
+                    "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    continue
+                if self.ttl and now - row[1] > self.ttl:
+                    self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                    continue
+                self._conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.hits += 1
+                return json.loads(row[0])
+            self.misses += 1
+        return None
+
+    def put(self, model, prompt, value, params=None):
+        # Only parsed, non-empty JSON results are worth keeping
+        if self.bypass or not value:
+            return
+        key = make_key(model, prompt, params)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, model, value, created, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, model, json.dumps(value), now, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        if self.ttl:
+            self._conn.execute("DELETE FROM llm_cache WHERE created < ?", (time.time() - self.ttl,))
+        count = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used ASC LIMIT ?)",
+                (count - self.max_entries,),
+            )
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            size = self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "entries": size,
+            "max_entries": self.max_entries,
+            "bypass": self.bypass,
+        }
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache():
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache()
+        return _default_cache
@@ -0,0 +1,266 @@
+import hashlib
+import json
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+
+import tracing
+
+MAX_CONCURRENCY = int(os.environ.get("PATHPLANNER_LLM_CONCURRENCY", "2"))
+DEFAULT_TIMEOUT = float(os.environ.get("PATHPLANNER_LLM_TIMEOUT", "180"))
+
+
+class GatewayTimeout(TimeoutError):
+    pass
+
+
+def _ollama_backend(**kwargs):
+    import ollama
+    return ollama.chat(**kwargs)
+
+
+def request_key(kwargs):
+    payload = json.dumps(kwargs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+_lane = threading.local()
+
+
+# 🐢 Model calls made inside this block (on this thread) are speculative: they only get a
+# slot when no interactive call is waiting, and never the last free one
+@contextmanager
+def background():
+    previous = getattr(_lane, "background", False)
+    _lane.background = True
+    try:
+        yield
+    finally:
+        _lane.background = previous
+
+
+def in_background():
+    return getattr(_lane, "background", False)
+
+
+class _Ticket:
+    __slots__ = ("background", "admitted_background")
+
+    def __init__(self, background):
+        self.background = background
+        self.admitted_background = False
+
+
+# 🚦 Shared front door to Ollama: single-flight for identical prompts,
+# a FIFO-fair concurrency cap, and per-call timeouts. Background calls wait in their
+# own FIFO lane behind every interactive one.
+class LLMGateway:
+    def __init__(self, max_concurrency=MAX_CONCURRENCY, timeout=DEFAULT_TIMEOUT, backend=None):
+        self.max_concurrency = max_concurrency
+        # One slot is kept for interactive calls unless there is only one
+        self.background_slots = max(max_concurrency - 1, 1)
+        self.timeout = timeout
+        self.backend = backend or _ollama_backend
+        self._cond = threading.Condition()
+        self._queue = deque()
+        self._background = deque()
+        self._active = 0
+        self._active_background = 0
+        self._inflight = {}
+        self._waits = deque(maxlen=500)
+        self.calls = 0
+        self.background_calls = 0
+        self.coalesced = 0
+        self.timeouts = 0
+
+    def _may_go(self, ticket):
+        if self._active >= self.max_concurrency:
+            return False
+        if not ticket.background:
+            return self._queue[0] is ticket
+        return (not self._queue and self._background[0] is ticket
+                and self._active_background < self.background_slots)
+
+    # 🎟️ Wait for a slot in strict arrival order within the ticket's lane
+    def _acquire(self, deadline, ticket):
+        start = time.monotonic()
+        with self._cond:
+            (self._background if ticket.background else self._queue).append(ticket)
+            try:
+                while not self._may_go(ticket):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self.timeouts += 1
+                        raise GatewayTimeout("timed out waiting for a free model slot")
+                    self._cond.wait(remaining)
+            finally:
+                (self._background if ticket.background else self._queue).remove(ticket)
+                # Whoever is now at the head may be able to go
+                self._cond.notify_all()
+            self._active += 1
+            if ticket.background:
+                ticket.admitted_background = True
+                self._active_background += 1
+            waited = time.monotonic() - start
+            self._waits.append(waited)
+        if tracing.ENABLED:
+            tracing.observe("llm_gateway.queue_wait", waited)
+
+    def _release(self, ticket):
+        with self._cond:
+            self._active -= 1
+            if ticket.admitted_background:
+                self._active_background -= 1
+            self._cond.notify_all()
+
+    # An interactive caller joining a speculative call still queued in the background
+    # lane moves it to the back of the interactive queue
+    def _promote(self, ticket):
+        if ticket.background and ticket in self._background:
+            self._background.remove(ticket)
+            ticket.background = False
+            self._queue.append(ticket)
+            self._cond.notify_all()
+
+    def chat(self, timeout=None, **kwargs):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        key = request_key(kwargs)
+        ticket = _Ticket(in_background())
+        with self._cond:
+            self.calls += 1
+            self.background_calls += ticket.background
+            leader = key not in self._inflight
+            if leader:
+                future = Future()
+                self._inflight[key] = (future, ticket)
+            else:
+                future, leader_ticket = self._inflight[key]
+                self.coalesced += 1
+                if not ticket.background:
+                    self._promote(leader_ticket)
+
+        if leader:
+            try:
+                self._acquire(deadline, ticket)
+            except GatewayTimeout as e:
+                self._finish(key, future, error=e)
+                raise
+            # The call runs on its own thread so a caller can give up without
+            # the slot being freed before the model actually finishes
+            threading.Thread(target=self._run, args=(key, future, ticket, kwargs), daemon=True).start()
+
+        try:
+            return future.result(timeout=max(deadline - time.monotonic(), 0))
+        except FutureTimeout:
+            with self._cond:
+                self.timeouts += 1
+            raise GatewayTimeout("model call exceeded its timeout")
+
+    def _run(self, key, future, ticket, kwargs):
+        try:
+            with tracing.span(f"ollama.chat[{kwargs.get('model')}]"):
+                result = self.backend(**kwargs)
+        except BaseException as e:
+            self._release(ticket)
+            self._finish(key, future, error=e)
+            return
+        self._release(ticket)
+        self._finish(key, future, result=result)
+
+    def _finish(self, key, future, result=None, error=None):
+        with self._cond:
+            if self._inflight.get(key, (None,))[0] is future:
+                del self._inflight[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    # 📡 Streaming calls take a slot for their whole duration but are never coalesced.
+    # The stream is read on its own thread so a stalled model still hits the deadline;
+    # as with chat(), the slot is freed only once the model side has actually stopped.
+    def chat_stream(self, timeout=None, **kwargs):
+        deadline = time.monotonic() + (timeout or self.timeout)
+        ticket = _Ticket(in_background())
+        with self._cond:
+            self.calls += 1
+            self.background_calls += ticket.background
+        self._acquire(deadline, ticket)
+        chunks = queue.Queue()
+        stop = threading.Event()
+        threading.Thread(target=self._pump, args=(kwargs, chunks, stop, ticket), daemon=True).start()
+        try:
+            while True:
+                try:
+                    kind, item = chunks.get(timeout=max(deadline - time.monotonic(), 0))
+                except queue.Empty:
+                    with self._cond:
+                        self.timeouts += 1
+                    raise GatewayTimeout("model stream exceeded its timeout")
+                if kind == "chunk":
+                    yield item
+                elif kind == "error":
+                    raise item
+                else:
+                    return
+        finally:
+            stop.set()
+
+    def _pump(self, kwargs, chunks, stop, ticket):
+        stream = None
+        try:
+            stream = self.backend(stream=True, **kwargs)
+            for chunk in stream:
+                if stop.is_set():
+                    break
+                chunks.put(("chunk", chunk))
+            chunks.put(("done", None))
+        except BaseException as e:
+            chunks.put(("error", e))
+        finally:
+            # Stops a reader the caller gave up on (closes the HTTP response)
+            close = getattr(stream, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception:
+                    pass
+            self._release(ticket)
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                "queue_depth": len(self._queue),
+                "background_queue_depth": len(self._background),
+                "in_flight": self._active,
+                "max_concurrency": self.max_concurrency,
+                "calls": self.calls,
+                "background_calls": self.background_calls,
+                "coalesced": self.coalesced,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(sum(waits) / len(waits) * 1000, 1) if waits else 0.0,
+                "max_wait_ms": round(waits[-1] * 1000, 1) if waits else 0.0,
+            }
+
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+
+def get_gateway():
+    global _gateway
+    with _gateway_lock:
+        if _gateway is None:
+            _gateway = LLMGateway()
+        return _gateway
+
+
+def set_gateway(gateway):
+    global _gateway
+    with _gateway_lock:
+        _gateway = gateway
@@ -1,9 +1,71 @@
 import json
 import re
-import ollama
+import time
+from functools import partial
+
+from json_stream import ObjectStreamParser
+from llm_cache import get_cache
+from llm_gateway import get_gateway
+from goal_matcher import get_goal_matcher
+from answer_cache import get_answer_cache
+from model_router import (
+    LARGE_MODEL, GOAL_SCHEMA, InvalidOutput, call_tokens, check_goal, check_topic_roadmap, get_router,
+    keep_alive_for, topic_roadmap_schema,
+)
+from tracing import traced
+
+# StudyBot and anything unrouted use the large model
+MODEL = LARGE_MODEL
+
+
+@traced()
+def extract_json(text):
+    json_block = re.search(r'\{.*\}', text, re.DOTALL)
+    try:
+        return json.loads(json_block.group(0)) if json_block else {}
+    except ValueError:
+        return {}
+
+
+# Strict parse for schema-constrained replies; an object wrapped in prose is still salvaged,
+# but a reply with no JSON in it is an error the router can retry instead of a silent {}
+def parse_json(text):
+    try:
+        return json.loads(text)
+    except ValueError:
+        pass
+    result = extract_json(text)
+    if not result:
+        raise ValueError("the reply was not a JSON object")
+    return result
+
+
+# 🗄️ Send a JSON-producing prompt through the model router, answering repeats from the
+# on-disk cache (a valid answer from any model on the route counts)
+@traced()
+def _chat_json(task, prompt, check, schema, use_cache=True):
+    cache = get_cache()
+    router = get_router()
+    if use_cache:
+        cached = cache.get_any(router.models(task), prompt)
+        if cached is not None:
+            return cached
+    result, model = router.route(task, [{"role": "user", "content": prompt}], parse_json, check, format=schema)
+    if use_cache and result:
+        cache.put(model, prompt, result)
+    return result
+
 
 # 🧠 Interpret a full learning goal and extract track + topics
-def interpret_goal(user_goal):
+@traced()
+def interpret_goal(user_goal, use_cache=True, use_local=True):
+    # Goals that name a curriculum we already have are answered from skills_db, no model call
+    if use_local:
+        match = get_goal_matcher().resolve(user_goal)
+        if match is not None:
+            return {"tracks": [match.track], "topics": list(match.topics),
+                    "confidence": match.confidence, "source": "local"}
+
     prompt = f"""
     You are a smart academic advisor.
     Interpret this learning goal: "{user_goal}"
@@ -16,19 +78,10 @@ def interpret_goal(user_goal):
       "topics": ["...", "..."]
     }}
     """
-    response = ollama.chat(
-        model="mistral:instruct",
-        messages=[{"role": "user", "content": prompt}]
-    )
-    try:
-        json_block = re.search(r'\{.*\}', response['message']['content'], re.DOTALL)
-        return json.loads(json_block.group(0)) if json_block else {}
-    except:
-        return {}
+    return _chat_json("interpret_goal", prompt, check_goal, GOAL_SCHEMA, use_cache)
 
-# 📘 Break a specific topic into a week-wise roadmap
-def generate_topic_roadmap(topic, weeks):
-    prompt = f"""
+def _topic_roadmap_prompt(topic, weeks):
+    return f"""
     Break down the topic "{topic}" into a detailed roadmap for {weeks} weeks.
     Each week should contain 2-3 logically connected subtopics or skills.
 
@@ -38,23 +91,140 @@ def generate_topic_roadmap(topic, weeks):
         "Week 2": ["...", "..."]
     }}
     """
-    response = ollama.chat(
-        model="mistral:instruct",
-        messages=[{"role": "user", "content": prompt}]
+
+# 📘 Break a specific topic into a week-wise roadmap
+@traced()
+def generate_topic_roadmap(topic, weeks, use_cache=True):
+    check = partial(check_topic_roadmap, weeks=weeks)
+    return _chat_json("topic_roadmap", _topic_roadmap_prompt(topic, weeks), check,
+                      topic_roadmap_schema(weeks), use_cache)
+
+# 📡 Same as generate_topic_roadmap, but yields (week, subtopics) as soon as each week closes.
+# Streams from the first model on the route; if that answer fails the check, it is corrected
+# or escalated like any routed call. When the new answer disagrees with weeks already shown,
+# (None, None) is yielded first: drop those weeks, the new plan follows in full. Only one
+# model's own answer is ever shown complete or cached, never a mix of two plans.
+@traced()
+def stream_topic_roadmap(topic, weeks, use_cache=True):
+    task = "topic_roadmap"
+    prompt = _topic_roadmap_prompt(topic, weeks)
+    check = partial(check_topic_roadmap, weeks=weeks)
+    schema = topic_roadmap_schema(weeks)
+    cache = get_cache()
+    router = get_router()
+    models = router.models(task)
+    if use_cache:
+        cached = cache.get_any(models, prompt)
+        if cached is not None:
+            yield from cached.items()
+            return
+
+    messages = [{"role": "user", "content": prompt}]
+    parser = ObjectStreamParser()
+    roadmap = {}
+    text = ""
+    final = {}
+    model = models[0]
+    start = time.perf_counter()
+    stream = get_gateway().chat_stream(
+        model=model, messages=messages, format=schema, keep_alive=keep_alive_for(model)
     )
+    for chunk in stream:
+        piece = chunk['message']['content']
+        text += piece
+        if chunk.get("done"):
+            final = chunk
+        for week, items in parser.feed(piece):
+            # Off-schema keys (including weeks past the requested count) and empty weeks are
+            # left for the check below rather than shown
+            if week not in schema["properties"] or not isinstance(items, list) or not items or not all(isinstance(i, str) and i.strip() for i in items):
+                continue
+            roadmap[week] = items
+            yield week, items
+
+    router.record_load(model, final)
+    outcome, result, confidence, reason = router.judge(text, parse_json, check)
+    elapsed = time.perf_counter() - start
+    router.record(model, elapsed, outcome)
+    tokens = call_tokens(final, messages, text)
+    if outcome == "ok":
+        router.record_tokens(task, tokens)
+        router.served(task, model)
+    else:
+        best, resume, rest = None, None, models[1:]
+        if outcome == "low_confidence":
+            best = (confidence, result, model, tokens)
+        else:
+            # Give the same model a targeted correction before escalating
+            if router.max_retries > 0:
+                resume, rest = (text, reason), models
+            router.record_tokens(task, tokens, wasted=True, retry=resume is not None)
+        try:
+            result, model = router.route(task, messages, parse_json, check, models=rest, spent=elapsed,
+                                         best=best, resume=resume, format=schema)
+        except Exception:
+            # Weeks already on screen are better than an error; nothing is cached
+            if not roadmap:
+                raise
+            return
+    if any(result.get(week) != items for week, items in roadmap.items()):
+        roadmap = {}
+        yield None, None
+    for week, items in result.items():
+        if week not in roadmap:
+            roadmap[week] = items
+            yield week, items
+    if not use_cache:
+        return
+    # A low-confidence answer the route settled for (out of budget) is shown but not kept
     try:
-        json_block = re.search(r'\{.*\}', response['message']['content'], re.DOTALL)
-        return json.loads(json_block.group(0)) if json_block else {}
-    except:
-        return {}
+        usable = check(result) >= router.min_confidence
+    except InvalidOutput:
+        usable = False
+    if usable:
+        cache.put(model, prompt, result)
+
+TUTOR_PROMPT = "You are a helpful, friendly academic tutor who explains things clearly."
+
+# 💬 Ask anything (StudyBot); reworded repeats of a known question come from the answer cache
+@traced()
+def ask_ai(query, use_cache=True):
+    if use_cache:
+        cached = get_answer_cache().lookup(query)
+        if cached is not None:
+            return cached["answer"]
+    response = get_gateway().chat(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": TUTOR_PROMPT},
+            {"role": "user", "content": query}
+        ],
+        keep_alive=keep_alive_for(MODEL)
+    )
+    answer = response["message"]["content"]
+    if use_cache:
+        get_answer_cache().put(query, answer)
+    return answer
 
-# 💬 Ask anything (StudyBot)
-def ask_ai(query):
-    response = ollama.chat(
-        model="mistral:instruct",
+# 💬 Streaming StudyBot: yields answer text token by token
+@traced()
+def ask_ai_stream(query, use_cache=True):
+    if use_cache:
+        cached = get_answer_cache().lookup(query)
+        if cached is not None:
+            yield cached["answer"]
+            return
+    stream = get_gateway().chat_stream(
+        model=MODEL,
         messages=[
-            {"role": "system", "content": "You are a helpful, friendly academic tutor who explains things clearly."},
+            {"role": "system", "content": TUTOR_PROMPT},
             {"role": "user", "content": query}
-        ]
+        ],
+        keep_alive=keep_alive_for(MODEL)
     )
-    return response["message"]["content"]
+    parts = []
+    for chunk in stream:
+        parts.append(chunk["message"]["content"])
+        yield parts[-1]
+    if use_cache:
+        get_answer_cache().put(query, "".join(parts))
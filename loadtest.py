@@ -0,0 +1,341 @@
+import argparse
+import json
+import os
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+# 🏋️ End-to-end load test: N concurrent sessions run the Goal, Topic and StudyBot flows
+# against local Ollama and DuckDuckGo stand-ins. Nothing leaves the machine.
+
+FLOWS = ("goal", "topic", "studybot")
+
+
+class Recorder:
+    def __init__(self):
+        from tracing import Histogram
+        self._histogram = Histogram
+        self.stages = {}
+        self.errors = {}
+        self.timeouts = {}
+        self.flows = 0
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds, outcome="ok"):
+        with self._lock:
+            hist = self.stages.get(stage)
+            if hist is None:
+                # window=None keeps every sample so percentiles cover the whole run
+                hist = self.stages[stage] = self._histogram(window=None)
+            hist.observe(seconds, error=outcome != "ok")
+            if outcome == "timeout":
+                self.timeouts[stage] = self.timeouts.get(stage, 0) + 1
+            elif outcome == "error":
+                self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def stage(self, name):
+        return _Stage(self, name)
+
+
+class _Stage:
+    def __init__(self, recorder, name):
+        self.recorder = recorder
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        from llm_gateway import GatewayTimeout
+        if exc_type is None:
+            outcome = "ok"
+        elif issubclass(exc_type, (GatewayTimeout, TimeoutError)):
+            outcome = "timeout"
+        else:
+            outcome = "error"
+        self.recorder.record(self.name, time.perf_counter() - self.start, outcome)
+        return False
+
+
+# 📋 What each session wrote, so the files on disk can be checked afterwards
+class Expected:
+    def __init__(self):
+        self.by_user = {}
+        self._lock = threading.Lock()
+
+    def set(self, user, week_key, topic, done):
+        with self._lock:
+            self.by_user.setdefault(user, {}).setdefault(week_key, {})[topic] = done
+
+
+def _open_store(args, user):
+    # A fresh store per session, as separate app processes would each have their own
+    if args.progress == "shared":
+        from progress_store import ProgressStore
+        return ProgressStore(os.path.join(args.workdir, "progress.json"), flush_delay=None)
+    from user_progress import UserProgressStore
+    return UserProgressStore(user, os.path.join(args.workdir, "progress_users"), flush_delay=None)
+
+
+def goal_flow(args, rec, expected, session, n):
+    from llm_utils import interpret_goal
+    from roadmap_generator import generate_roadmap
+    from resource_index import get_resource_index
+    from prefetch import resource_links
+
+    goal = f"become good at subject {(session * 7 + n) % args.distinct}"
+    with rec.stage("goal.interpret"):
+        result = interpret_goal(goal)
+    topics = result.get("topics") or ["Basics"]
+    with rec.stage("goal.roadmap"):
+        roadmap = generate_roadmap(topics, args.weeks, goal)
+    with rec.stage("goal.resources"):
+        resource_links(get_resource_index("resources_db.json"), topics)
+
+    user = f"user{session % args.users}"
+    store = _open_store(args, user)
+    goal_key = f"s{session}r{n} {goal}"
+    with rec.stage("goal.progress"):
+        for week, week_topics in roadmap.items():
+            week_key = f"{goal_key}_{week}"
+            store.ensure_week(week_key, week_topics)
+            for topic in week_topics:
+                done = random.random() < 0.5
+                store.set(week_key, topic, done)
+                expected.set(user, week_key, topic, done)
+        store.flush()
+
+
+def topic_flow(args, rec, expected, session, n):
+    from llm_utils import stream_topic_roadmap
+    from resource_suggester import fetch_youtube_links_batch
+
+    topic = f"topic {(session * 5 + n) % args.distinct}"
+    roadmap = {}
+    with rec.stage("topic.roadmap"):
+        first = None
+        start = time.perf_counter()
+        for week, items in stream_topic_roadmap(topic, args.weeks):
+            if week is None:
+                # A rejected answer's weeks are replaced by the escalated plan
+                roadmap = {}
+                continue
+            if first is None:
+                first = time.perf_counter() - start
+            roadmap[week] = items
+    if first is not None:
+        rec.record("topic.first_week", first)
+    with rec.stage("topic.links"):
+        fetch_youtube_links_batch([f"{topic} {week}" for week in roadmap])
+
+
+def studybot_flow(args, rec, expected, session, n):
+    from study_session import ChatSession
+
+    chat = ChatSession()
+    questions = [f"what is concept {(session * 3 + n) % args.distinct}", "can you give an example?"]
+    for turn, question in enumerate(questions, 1):
+        with rec.stage(f"studybot.turn{turn}"):
+            for _ in chat.ask_stream(question):
+                pass
+
+
+FLOW_FUNCS = {"goal": goal_flow, "topic": topic_flow, "studybot": studybot_flow}
+
+
+def run_session(args, rec, expected, session, barrier):
+    barrier.wait()
+    if args.ramp:
+        time.sleep(args.ramp * session / max(args.sessions, 1))
+    for n in range(args.iterations):
+        flow = args.flows[(session + n) % len(args.flows)]
+        try:
+            with rec.stage(f"flow.{flow}"):
+                FLOW_FUNCS[flow](args, rec, expected, session, n)
+        except Exception:
+            # Already counted by the stage that failed (and by flow.*)
+            pass
+        with rec._lock:
+            rec.flows += 1
+
+
+# 🔍 Every progress file must still parse, and hold exactly what the sessions wrote
+def check_progress(args, expected):
+    report = {"files": 0, "corrupt": 0, "lost_updates": 0, "checked": 0}
+    if args.progress == "shared":
+        from utils import load_progress
+        path = os.path.join(args.workdir, "progress.json")
+        report["files"] = 1
+        try:
+            # Replays the journal too, so updates not yet compacted count as saved
+            on_disk = {"shared": load_progress(path)}
+        except ValueError:
+            report["corrupt"] = 1
+            return report
+        merged = {}
+        for weeks in expected.by_user.values():
+            merged.update(weeks)
+        wanted = {"shared": merged}
+    else:
+        from user_progress import UserProgressStore
+        root = os.path.join(args.workdir, "progress_users")
+        for dirpath, _, files in os.walk(root):
+            for name in files:
+                if name.endswith(".json"):
+                    report["files"] += 1
+                    try:
+                        with open(os.path.join(dirpath, name)) as f:
+                            json.load(f)
+                    except ValueError:
+                        report["corrupt"] += 1
+                elif name.endswith(".journal"):
+                    report["files"] += 1
+                    with open(os.path.join(dirpath, name), "rb") as f:
+                        try:
+                            for line in f:
+                                json.loads(line)
+                        except ValueError:
+                            report["corrupt"] += 1
+        on_disk = {user: UserProgressStore(user, root, flush_delay=None).data for user in expected.by_user}
+        wanted = expected.by_user
+    for user, weeks in wanted.items():
+        for week_key, topics in weeks.items():
+            for topic, done in topics.items():
+                report["checked"] += 1
+                if on_disk.get(user, {}).get(week_key, {}).get(topic) != done:
+                    report["lost_updates"] += 1
+    return report
+
+
+def print_report(args, rec, wall, stubs, progress):
+    from model_router import get_router
+    ollama_stub, ddg_stub = stubs
+    print(f"\n== {args.sessions} sessions × {args.iterations} flows in {wall:.2f}s ==")
+    print(f"throughput: {rec.flows / wall:.2f} flows/s, {ollama_stub.requests / wall:.2f} model calls/s "
+          f"(stub peak concurrency {ollama_stub.max_active}), {ddg_stub.hits} search pages")
+    print(f"{'stage':<20}{'count':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'err%':>7}{'tmo%':>7}")
+    rows = {}
+    for name in sorted(rec.stages):
+        hist = rec.stages[name]
+        q = hist.quantiles((0.5, 0.95, 0.99))
+        errors = rec.errors.get(name, 0)
+        timeouts = rec.timeouts.get(name, 0)
+        rows[name] = {
+            "count": hist.count, "p50_ms": q[0.5] * 1000, "p95_ms": q[0.95] * 1000, "p99_ms": q[0.99] * 1000,
+            "max_ms": max(hist.samples) * 1000, "error_rate": errors / hist.count, "timeout_rate": timeouts / hist.count,
+        }
+        r = rows[name]
+        print(f"{name:<20}{r['count']:>7}{r['p50_ms']:>10.1f}{r['p95_ms']:>10.1f}{r['p99_ms']:>10.1f}"
+              f"{r['max_ms']:>10.1f}{r['error_rate'] * 100:>7.1f}{r['timeout_rate'] * 100:>7.1f}")
+    routing = get_router().stats()
+    if routing["warmup_s"]:
+        print("warm-up: " + ", ".join(f"{m} {s:.2f}s" for m, s in routing["warmup_s"].items()))
+    for model, m in sorted(routing["models"].items()):
+        outcomes = ", ".join(f"{k} {m[k]}" for k in ("ok", "low_confidence", "invalid", "unparsed", "timeout", "error") if k in m)
+        print(f"model {model:<28} {m['calls']:>5} calls  p50 {m['p50_ms']:>8.1f} ms  p95 {m['p95_ms']:>8.1f} ms  "
+              f"parse failures {m['parse_failure_rate']:.1%}  cold starts {m['cold_starts']} "
+              f"(max load {m['max_load_s']:.2f}s)  ({outcomes})")
+    for task, t in sorted(routing["tasks"].items()):
+        print(f"route {task:<28} {t['requests']:>5} requests, {t['escalation_rate']:.0%} escalated, {t['retries']} retries, "
+              f"{t['wasted_tokens']}/{t['tokens']} tokens wasted, {t['settled']} settled within budget, {t['failed']} failed")
+    status = "✅" if not progress["corrupt"] and not progress["lost_updates"] else "❌"
+    print(f"{status} progress ({args.progress}): {progress['files']} files, {progress['corrupt']} corrupt, "
+          f"{progress['lost_updates']}/{progress['checked']} updates lost")
+    return {
+        "sessions": args.sessions, "iterations": args.iterations, "wall_s": wall,
+        "flows_per_s": rec.flows / wall, "model_calls": ollama_stub.requests, "search_pages": ddg_stub.hits,
+        "stages": rows, "routing": routing, "progress": progress,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent-session load test against local stand-ins")
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent simulated students")
+    parser.add_argument("--iterations", type=int, default=3, help="flows per session")
+    parser.add_argument("--flows", default=",".join(FLOWS), help="comma-separated subset of: " + ", ".join(FLOWS))
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct goals/topics/questions (lower = more repeats)")
+    parser.add_argument("--weeks", type=int, default=4)
+    parser.add_argument("--users", type=int, default=10, help="distinct progress users (sessions share them)")
+    parser.add_argument("--progress", choices=["users", "shared"], default="users",
+                        help="per-user shards, or one shared progress.json")
+    parser.add_argument("--latency", type=float, default=0.5, help="fake Ollama time to first token (s)")
+    parser.add_argument("--tokens-per-sec", type=float, default=50.0, help="fake Ollama token rate")
+    parser.add_argument("--small-latency", type=float, default=None, help="small model time to first token (default: latency / 4)")
+    parser.add_argument("--small-tokens-per-sec", type=float, default=None, help="small model token rate (default: 4x)")
+    parser.add_argument("--small-prose-rate", type=float, default=0.1,
+                        help="fraction of small-model JSON answers that come back as prose (forces escalation)")
+    parser.add_argument("--load-time", type=float, default=0.0, help="fake Ollama model load time when a model is cold (s)")
+    parser.add_argument("--no-warmup", action="store_true", help="skip loading the models before the sessions start")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of model calls that fail")
+    parser.add_argument("--search-delay", type=float, default=0.05, help="fake DuckDuckGo response delay (s)")
+    parser.add_argument("--llm-concurrency", type=int, default=None, help="gateway slots (default: PATHPLANNER_LLM_CONCURRENCY)")
+    parser.add_argument("--timeout", type=float, default=60.0, help="per model call timeout (s)")
+    parser.add_argument("--ramp", type=float, default=0.0, help="spread session starts over this many seconds")
+    parser.add_argument("--json", help="also write the report here")
+    args = parser.parse_args()
+    args.flows = [f.strip() for f in args.flows.split(",") if f.strip()]
+    unknown = [f for f in args.flows if f not in FLOWS]
+    if unknown:
+        parser.error(f"unknown flow(s): {', '.join(unknown)}")
+
+    args.workdir = tempfile.mkdtemp(prefix="pathplanner-load-")
+    # Fresh on-disk caches so the run starts cold
+    os.environ["PATHPLANNER_LLM_CACHE"] = os.path.join(args.workdir, "llm_cache.db")
+
+    import ollama
+    import resource_suggester
+    from fake_services import OllamaStub, DuckDuckGoStub
+    from llm_gateway import LLMGateway, MAX_CONCURRENCY, set_gateway
+    from model_router import SMALL_MODEL, LARGE_MODEL, get_router
+
+    models = {LARGE_MODEL: {}}
+    if SMALL_MODEL:
+        models[SMALL_MODEL] = {
+            "latency": args.latency / 4 if args.small_latency is None else args.small_latency,
+            "tokens_per_sec": args.tokens_per_sec * 4 if args.small_tokens_per_sec is None else args.small_tokens_per_sec,
+            "prose_rate": args.small_prose_rate,
+        }
+    ollama_stub = OllamaStub(latency=args.latency, tokens_per_sec=args.tokens_per_sec,
+                             error_rate=args.error_rate, models=models, load_time=args.load_time).start()
+    ddg_stub = DuckDuckGoStub(delay=args.search_delay).start()
+    resource_suggester.SEARCH_URL = ddg_stub.url
+    client = ollama.Client(host=ollama_stub.url)
+    set_gateway(LLMGateway(max_concurrency=args.llm_concurrency or MAX_CONCURRENCY,
+                           timeout=args.timeout, backend=client.chat))
+
+    if not args.no_warmup:
+        get_router().warm_up()
+
+    rec = Recorder()
+    expected = Expected()
+    barrier = threading.Barrier(args.sessions)
+    threads = [
+        threading.Thread(target=run_session, args=(args, rec, expected, i, barrier), daemon=True)
+        for i in range(args.sessions)
+    ]
+    start = time.perf_counter()
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+        progress = check_progress(args, expected)
+        result = print_report(args, rec, wall, (ollama_stub, ddg_stub), progress)
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump(result, f, indent=2)
+    finally:
+        ollama_stub.stop()
+        ddg_stub.stop()
+        shutil.rmtree(args.workdir, ignore_errors=True)
+    if progress["corrupt"] or progress["lost_updates"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,403 @@
+import os
+import threading
+import time
+
+import tracing
+from llm_gateway import GatewayTimeout, get_gateway
+
+SMALL_MODEL = os.environ.get("PATHPLANNER_SMALL_MODEL", "qwen2.5:1.5b-instruct")
+LARGE_MODEL = os.environ.get("PATHPLANNER_LARGE_MODEL", "mistral:instruct")
+# Answers that parse but score below this are retried on the next (larger) model
+MIN_CONFIDENCE = float(os.environ.get("PATHPLANNER_MIN_CONFIDENCE", "0.75"))
+# Corrections sent back to the same model for an unparseable or off-schema answer before escalating
+MAX_RETRIES = int(os.environ.get("PATHPLANNER_JSON_RETRIES", "1"))
+
+
+# Ollama reads a keep_alive number as seconds and a string as a Go duration, which needs a unit
+# ("-1" is rejected), so a plain number from the environment is sent as a number
+def _keep_alive(value):
+    try:
+        number = float(value)
+    except ValueError:
+        return value
+    return int(number) if number.is_integer() else number
+
+
+# ⏳ How long Ollama keeps each model loaded after a call ("30m", -1 = forever, 0 = unload).
+# The small model is cheap to keep resident; the large one is released after a quiet spell.
+KEEP_ALIVE = _keep_alive(os.environ.get("PATHPLANNER_KEEP_ALIVE", "30m"))
+KEEP_ALIVE_BY_MODEL = {SMALL_MODEL: _keep_alive(os.environ.get("PATHPLANNER_SMALL_KEEP_ALIVE", "-1"))}
+WARMUP = os.environ.get("PATHPLANNER_WARMUP", "1") not in ("", "0", "false")
+# A call whose load_duration exceeds this paid for loading the model
+COLD_START_SECONDS = 0.5
+
+# Models to try in order, and the latency budget (s) for the whole request.
+# An empty PATHPLANNER_SMALL_MODEL sends everything straight to the large model.
+# StudyBot's free-text answers are not routed; they stream from the large model (llm_utils.MODEL).
+ROUTES = {
+    "interpret_goal": {"models": (SMALL_MODEL, LARGE_MODEL),
+                       "budget": float(os.environ.get("PATHPLANNER_GOAL_BUDGET", "10"))},
+    "topic_roadmap": {"models": (SMALL_MODEL, LARGE_MODEL),
+                      "budget": float(os.environ.get("PATHPLANNER_ROADMAP_BUDGET", "30"))},
+}
+
+
+def keep_alive_for(model):
+    return KEEP_ALIVE_BY_MODEL.get(model, KEEP_ALIVE)
+
+
+class InvalidOutput(ValueError):
+    pass
+
+
+def _check_strings(value, what):
+    if not isinstance(value, list) or not all(isinstance(v, str) and v.strip() for v in value):
+        raise InvalidOutput(f"{what} must be a list of non-empty strings")
+
+
+# 🎯 Goal interpretation: {"tracks": [...], "topics": [...]}; returns a 0-1 confidence
+def check_goal(result):
+    if not isinstance(result, dict):
+        raise InvalidOutput("expected a JSON object")
+    _check_strings(result.get("tracks"), "tracks")
+    _check_strings(result.get("topics"), "topics")
+    topics = result["topics"]
+    if not topics:
+        raise InvalidOutput("no topics")
+    score = 1.0
+    if not result["tracks"]:
+        score -= 0.25
+    # The prompt asks for 4-5 topics; one either way is still a usable answer
+    if not 3 <= len(topics) <= 6:
+        score -= 0.25
+    distinct = len({t.strip().lower() for t in topics})
+    score -= 0.5 * (1 - distinct / len(topics))
+    # Whole sentences instead of topic names usually mean the model misread the task
+    wordy = sum(len(t.split()) > 8 for t in topics)
+    score -= 0.5 * wordy / len(topics)
+    return max(score, 0.0)
+
+
+# 📘 Topic roadmap: {"Week 1": [...], ...}; confidence drops for missing weeks or odd-sized weeks,
+# and a key other than Week 1..N (an extra week, a stray field) makes the answer invalid
+def check_topic_roadmap(result, weeks):
+    if not isinstance(result, dict) or not result:
+        raise InvalidOutput("expected a non-empty JSON object")
+    expected = {f"Week {i}" for i in range(1, weeks + 1)}
+    unexpected = [key for key in result if key not in expected]
+    if unexpected:
+        raise InvalidOutput(f"only Week 1 to Week {weeks} are allowed, got {', '.join(map(repr, unexpected))}")
+    for week, items in result.items():
+        _check_strings(items, week)
+    covered = len(expected & set(result)) / weeks
+    well_sized = sum(1 <= len(items) <= 4 for items in result.values()) / len(result)
+    return 0.7 * covered + 0.3 * well_sized
+
+
+# 📐 JSON schemas passed as Ollama's `format`, so the model is constrained to the expected shape
+GOAL_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "tracks": {"type": "array", "items": {"type": "string"}, "minItems": 1, "maxItems": 3},
+        "topics": {"type": "array", "items": {"type": "string"}, "minItems": 3, "maxItems": 6},
+    },
+    "required": ["tracks", "topics"],
+}
+
+
+def topic_roadmap_schema(weeks):
+    week = {"type": "array", "items": {"type": "string"}, "minItems": 1, "maxItems": 4}
+    names = [f"Week {i}" for i in range(1, weeks + 1)]
+    return {"type": "object", "properties": {name: week for name in names}, "required": names,
+            "additionalProperties": False}
+
+
+# Tokens a call consumed: prompt plus answer, as reported by Ollama when available
+# (text is the answer, for a streamed call whose final chunk carries no content)
+def call_tokens(response, messages, text=None):
+    # study_session imports this module through llm_utils, so its helper is imported on use
+    from study_session import estimate_tokens
+    prompt = response.get("prompt_eval_count")
+    if prompt is None:
+        prompt = sum(estimate_tokens(m.get("content", "")) for m in messages)
+    answer = response.get("eval_count")
+    if answer is None:
+        answer = estimate_tokens(response["message"]["content"] if text is None else text)
+    return prompt + answer
+
+
+def correction(messages, text, reason):
+    return list(messages) + [
+        {"role": "assistant", "content": text},
+        {"role": "user", "content": f"That reply was not usable: {reason}. "
+                                    "Reply again with only the corrected JSON object."},
+    ]
+
+
+class ModelStats:
+    def __init__(self):
+        self.latency = tracing.Histogram()
+        self.outcomes = {}
+        self.cold_starts = 0
+        self.max_load = 0.0
+
+    def record(self, seconds, outcome):
+        self.latency.observe(seconds, error=outcome in ("timeout", "error"))
+        self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+
+# 🪜 Cheap model first, larger one only when the answer fails validation or looks unsure,
+# and only if the larger model's typical latency still fits the request's budget.
+# Unparseable or off-schema answers first get MAX_RETRIES targeted corrections on the same model.
+class ModelRouter:
+    def __init__(self, routes=None, min_confidence=MIN_CONFIDENCE, max_retries=MAX_RETRIES, gateway=None):
+        self.routes = routes or ROUTES
+        self.min_confidence = min_confidence
+        self.max_retries = max_retries
+        self._gateway = gateway
+        self._lock = threading.Lock()
+        self._models = {}
+        self._tasks = {}
+        self.warmup = {}
+
+    @property
+    def gateway(self):
+        return self._gateway or get_gateway()
+
+    def models(self, task):
+        return [m for m in self.routes[task]["models"] if m]
+
+    # Every model some task can be routed to, in route order
+    def routed_models(self):
+        return list(dict.fromkeys(m for task in self.routes for m in self.models(task)))
+
+    def expected_latency(self, model):
+        with self._lock:
+            stats = self._models.get(model)
+            if stats is None or not stats.latency.samples:
+                return 0.0
+            return stats.latency.quantiles((0.5,))[0.5]
+
+    def _model(self, model):
+        stats = self._models.get(model)
+        if stats is None:
+            stats = self._models[model] = ModelStats()
+        return stats
+
+    def _task(self, task):
+        stats = self._tasks.get(task)
+        if stats is None:
+            stats = self._tasks[task] = {"requests": 0, "escalated": 0, "settled": 0, "failed": 0,
+                                         "retries": 0, "tokens": 0, "wasted_tokens": 0, "served_by": {}}
+        return stats
+
+    def record(self, model, seconds, outcome):
+        with self._lock:
+            self._model(model).record(seconds, outcome)
+        if tracing.ENABLED:
+            tracing.observe(f"model_router.{model}", seconds, error=outcome in ("timeout", "error"))
+
+    # Load time Ollama reported for a call (nanoseconds), counted as a cold start past the threshold
+    def record_load(self, model, response):
+        seconds = (response.get("load_duration") or 0) / 1e9
+        with self._lock:
+            stats = self._model(model)
+            stats.max_load = max(stats.max_load, seconds)
+            if seconds > COLD_START_SECONDS:
+                stats.cold_starts += 1
+        return seconds
+
+    # Token spend per task; wasted = answers that were thrown away
+    def record_tokens(self, task, tokens, wasted=False, retry=False):
+        with self._lock:
+            stats = self._task(task)
+            stats["tokens"] += tokens
+            if wasted:
+                stats["wasted_tokens"] += tokens
+            if retry:
+                stats["retries"] += 1
+
+    # settled: a low-confidence answer was kept; failed: no tier produced a usable answer
+    def served(self, task, model, settled=False, failed=False):
+        with self._lock:
+            stats = self._task(task)
+            stats["requests"] += 1
+            if model != self.models(task)[0]:
+                stats["escalated"] += 1
+            if settled:
+                stats["settled"] += 1
+            if failed:
+                stats["failed"] += 1
+            else:
+                stats["served_by"][model] = stats["served_by"].get(model, 0) + 1
+
+    # Parses and scores one answer; returns (outcome, result, confidence, reason).
+    # parse raises ValueError for text that is not JSON at all.
+    def judge(self, text, parse, check):
+        try:
+            result = parse(text)
+        except ValueError as e:
+            return "unparsed", {}, 0.0, str(e)
+        try:
+            confidence = check(result)
+        except InvalidOutput as e:
+            return "invalid", result, 0.0, str(e)
+        if confidence < self.min_confidence:
+            return "low_confidence", result, confidence, f"confidence {confidence:.2f}"
+        return "ok", result, confidence, ""
+
+    # One model, plus targeted corrections for unusable answers while the budget allows.
+    # Returns (outcome, result, confidence, tokens); tokens of discarded tries are already booked.
+    def _attempt(self, task, model, messages, parse, check, deadline, last, retries, kwargs):
+        for attempt in range(retries + 1):
+            remaining = deadline - time.monotonic() if deadline else None
+            timeout = None if last or remaining is None else remaining
+            start = time.perf_counter()
+            try:
+                response = self.gateway.chat(model=model, messages=messages, timeout=timeout,
+                                             keep_alive=keep_alive_for(model), **kwargs)
+            except GatewayTimeout:
+                self.record(model, time.perf_counter() - start, "timeout")
+                raise
+            except Exception:
+                self.record(model, time.perf_counter() - start, "error")
+                raise
+            self.record_load(model, response)
+            text = response["message"]["content"]
+            outcome, result, confidence, reason = self.judge(text, parse, check)
+            self.record(model, time.perf_counter() - start, outcome)
+            tokens = call_tokens(response, messages)
+            out_of_time = not last and deadline is not None and deadline <= time.monotonic()
+            if outcome not in ("unparsed", "invalid") or attempt == retries or out_of_time:
+                return outcome, result, confidence, tokens
+            self.record_tokens(task, tokens, wasted=True, retry=True)
+            messages = correction(messages, text, reason)
+
+    # 🚏 Returns (result, model). Already-tried tiers can be handed in when the first attempt
+    # happened elsewhere, e.g. a streamed answer: models= the tiers left, spent= time used,
+    # best= a low-confidence (confidence, result, model, tokens), resume= (text, reason) to
+    # send models[0] a correction instead of starting over.
+    def route(self, task, messages, parse, check, models=None, spent=0.0, best=None, resume=None, **kwargs):
+        budget = self.routes[task]["budget"]
+        models = self.models(task) if models is None else models
+        deadline = time.monotonic() + budget - spent if budget else None
+        error = None
+        kept = []
+        for i, model in enumerate(models):
+            last = i == len(models) - 1
+            remaining = deadline - time.monotonic() if deadline else None
+            if best is not None and remaining is not None and self.expected_latency(model) > remaining:
+                # Escalating would blow the budget; a schema-valid answer beats a late one
+                break
+            if not last and remaining is not None and remaining <= 0:
+                continue
+            tries, retries = messages, self.max_retries
+            if i == 0 and resume is not None:
+                tries, retries = correction(messages, *resume), self.max_retries - 1
+            try:
+                outcome, result, confidence, tokens = self._attempt(
+                    task, model, tries, parse, check, deadline, last, max(retries, 0), kwargs)
+            except Exception as e:
+                error = e
+                continue
+            error = None
+            if outcome == "ok":
+                self._settle(task, kept + ([best] if best else []), None)
+                self.record_tokens(task, tokens)
+                self.served(task, model)
+                return result, model
+            if outcome == "low_confidence" and (best is None or confidence > best[0]):
+                if best is not None:
+                    kept.append(best)
+                best = (confidence, result, model, tokens)
+            else:
+                self.record_tokens(task, tokens, wasted=True)
+        if best is not None:
+            self._settle(task, kept, best)
+            self.served(task, best[2], settled=True)
+            return best[1], best[2]
+        model = models[-1] if models else self.models(task)[-1]
+        self._settle(task, kept, None)
+        self.served(task, model, failed=True)
+        if error is not None:
+            raise error
+        # Every tier answered, none usably: same empty result the lenient parser always gave
+        return {}, model
+
+    def _settle(self, task, candidates, chosen):
+        for candidate in candidates:
+            self.record_tokens(task, candidate[3], wasted=True)
+        if chosen is not None:
+            self.record_tokens(task, chosen[3])
+
+    # 🔥 Load every routed model (an empty chat makes Ollama load it without generating)
+    # so the first real request does not pay for it; returns load seconds per model
+    def warm_up(self, models=None):
+        if models is None:
+            models = self.routed_models()
+        for model in models:
+            start = time.perf_counter()
+            try:
+                response = self.gateway.chat(model=model, messages=[], keep_alive=keep_alive_for(model))
+            except Exception:
+                self.record(model, time.perf_counter() - start, "error")
+                continue
+            load = self.record_load(model, response)
+            with self._lock:
+                self.warmup[model] = round(load or time.perf_counter() - start, 3)
+        return dict(self.warmup)
+
+    def stats(self):
+        with self._lock:
+            models = {}
+            for model, stats in self._models.items():
+                q = stats.latency.quantiles((0.5, 0.95))
+                answers = stats.latency.count - stats.outcomes.get("timeout", 0) - stats.outcomes.get("error", 0)
+                models[model] = {
+                    "calls": stats.latency.count,
+                    "p50_ms": round(q[0.5] * 1000, 1),
+                    "p95_ms": round(q[0.95] * 1000, 1),
+                    "parse_failure_rate": round(stats.outcomes.get("unparsed", 0) / answers, 3) if answers else 0.0,
+                    "cold_starts": stats.cold_starts,
+                    "max_load_s": round(stats.max_load, 3),
+                    "keep_alive": keep_alive_for(model),
+                    **stats.outcomes,
+                }
+            tasks = {
+                task: {**stats, "served_by": dict(stats["served_by"]),
+                       "escalation_rate": round(stats["escalated"] / stats["requests"], 3) if stats["requests"] else 0.0}
+                for task, stats in self._tasks.items()
+            }
+            return {"models": models, "tasks": tasks, "warmup_s": dict(self.warmup)}
+
+
+_router = None
+_router_lock = threading.Lock()
+
+
+def get_router():
+    global _router
+    with _router_lock:
+        if _router is None:
+            _router = ModelRouter()
+        return _router
+
+
+def set_router(router):
+    global _router
+    with _router_lock:
+        _router = router
+
+
+_warmup_started = False
+
+
+# Warm the routed models once per process, in the background
+def start_warmup():
+    global _warmup_started
+    with _router_lock:
+        if _warmup_started or not WARMUP:
+            return False
+        _warmup_started = True
+    threading.Thread(target=get_router().warm_up, name="model-warmup", daemon=True).start()
+    return True
@@ -0,0 +1,189 @@
+import os
+import re
+import struct
+import threading
+
+# 🔤 TrueType fonts the PDF exporter falls back to for text the built-in (cp1252) fonts cannot
+# show, e.g. Hindi or Chinese topic names. PATHPLANNER_PDF_FONTS (os.pathsep-separated .ttf/.ttc
+# paths) is tried first; a character no font covers is printed as "?".
+FONT_CANDIDATES = [
+    "/usr/share/fonts/truetype/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/noto/NotoSansDevanagari-Regular.ttf",
+    "/usr/share/fonts/truetype/lohit-devanagari/Lohit-Devanagari.ttf",
+    "/usr/share/fonts/truetype/freefont/FreeSans.ttf",
+    "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+    "/usr/share/fonts/wenquanyi/wqy-microhei/wqy-microhei.ttc",
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "/Library/Fonts/Arial Unicode.ttf",
+    "/System/Library/Fonts/Supplemental/Arial Unicode.ttf",
+    "C:/Windows/Fonts/Nirmala.ttf",
+    "C:/Windows/Fonts/msyh.ttc",
+    "C:/Windows/Fonts/arialuni.ttf",
+]
+
+# Tables a PDF viewer needs from an embedded TrueType font
+EMBED_TABLES = ("head", "hhea", "hmtx", "maxp", "cvt ", "fpgm", "prep")
+
+
+def _checksum(data):
+    data += b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(">%dI" % (len(data) // 4), data)) & 0xFFFFFFFF
+
+
+def _write_sfnt(tables):
+    tags = sorted(tables)
+    n = len(tags)
+    selector = n.bit_length() - 1
+    search_range = 16 * (1 << selector)
+    header = struct.pack(">IHHHH", 0x00010000, n, search_range, selector, n * 16 - search_range)
+    offset = 12 + 16 * n
+    directory, body = [], bytearray()
+    head_at = None
+    for tag in tags:
+        data = tables[tag]
+        if tag == "head":
+            head_at = offset + len(body)
+        directory.append(struct.pack(">4sIII", tag.encode("latin-1"), _checksum(data), offset + len(body), len(data)))
+        body += data + b"\0" * (-len(data) % 4)
+    font = bytearray(header + b"".join(directory) + body)
+    struct.pack_into(">I", font, head_at + 8, (0xB1B0AFBA - _checksum(bytes(font))) & 0xFFFFFFFF)
+    return bytes(font)
+
+
+class TrueTypeFont:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.data = f.read()
+        self.path = path
+        start = struct.unpack_from(">I", self.data, 12)[0] if self.data[:4] == b"ttcf" else 0
+        self.tables = {}
+        for i in range(struct.unpack_from(">H", self.data, start + 4)[0]):
+            tag, _, offset, length = struct.unpack_from(">4sIII", self.data, start + 12 + 16 * i)
+            self.tables[tag.decode("latin-1")] = (offset, length)
+        if "glyf" not in self.tables or "loca" not in self.tables:
+            raise ValueError(f"{path}: only TrueType-outline fonts can be embedded")
+        head = self.table("head")
+        self.units_per_em = struct.unpack_from(">H", head, 18)[0]
+        self.bbox = struct.unpack_from(">4h", head, 36)
+        self.long_loca = struct.unpack_from(">h", head, 50)[0] == 1
+        hhea = self.table("hhea")
+        self.ascent, self.descent = struct.unpack_from(">hh", hhea, 4)
+        n_metrics = struct.unpack_from(">H", hhea, 34)[0]
+        self.advances = struct.unpack_from(">" + "Hh" * n_metrics, self.table("hmtx"))[::2]
+        self.num_glyphs = struct.unpack_from(">H", self.table("maxp"), 4)[0]
+        self.cmap = self._read_cmap()
+        name = os.path.splitext(os.path.basename(path))[0]
+        self.name = re.sub(r"[^A-Za-z0-9-]", "", name) or "Font"
+
+    def table(self, tag):
+        offset, length = self.tables[tag]
+        return self.data[offset:offset + length]
+
+    def _read_cmap(self):
+        cmap = self.table("cmap")
+        subtables = {}
+        for i in range(struct.unpack_from(">H", cmap, 2)[0]):
+            platform, encoding, offset = struct.unpack_from(">HHI", cmap, 4 + 8 * i)
+            subtables[(platform, encoding)] = offset
+        mapping = {}
+        for key in ((3, 10), (0, 4), (3, 1), (0, 3)):
+            offset = subtables.get(key)
+            if offset is None:
+                continue
+            fmt = struct.unpack_from(">H", cmap, offset)[0]
+            if fmt == 12:
+                for i in range(struct.unpack_from(">I", cmap, offset + 12)[0]):
+                    first, last, glyph = struct.unpack_from(">III", cmap, offset + 16 + 12 * i)
+                    for code in range(first, last + 1):
+                        mapping[code] = glyph + code - first
+                return mapping
+            if fmt == 4:
+                segments = struct.unpack_from(">H", cmap, offset + 6)[0] // 2
+                ends = offset + 14
+                starts = ends + 2 * segments + 2
+                deltas = starts + 2 * segments
+                ranges = deltas + 2 * segments
+                for i in range(segments):
+                    last, = struct.unpack_from(">H", cmap, ends + 2 * i)
+                    first, = struct.unpack_from(">H", cmap, starts + 2 * i)
+                    delta, = struct.unpack_from(">H", cmap, deltas + 2 * i)
+                    range_offset, = struct.unpack_from(">H", cmap, ranges + 2 * i)
+                    for code in range(first, min(last, 0xFFFE) + 1):
+                        if range_offset == 0:
+                            glyph = (code + delta) & 0xFFFF
+                        else:
+                            glyph, = struct.unpack_from(">H", cmap, ranges + 2 * i + range_offset + 2 * (code - first))
+                            glyph = (glyph + delta) & 0xFFFF if glyph else 0
+                        if glyph:
+                            mapping[code] = glyph
+                return mapping
+        return mapping
+
+    def advance(self, glyph):
+        return self.advances[min(glyph, len(self.advances) - 1)]
+
+    def _loca(self):
+        loca = self.table("loca")
+        if self.long_loca:
+            return struct.unpack_from(">%dI" % (self.num_glyphs + 1), loca)
+        return [o * 2 for o in struct.unpack_from(">%dH" % (self.num_glyphs + 1), loca)]
+
+    # ✂️ Same glyph ids, but outlines only for the glyphs used (and the parts composite glyphs
+    # are built from), so a large system font costs a few KB in the PDF
+    def subset(self, glyphs):
+        loca = self._loca()
+        glyf = self.table("glyf")
+        keep = {0} | set(glyphs)
+        pending = list(keep)
+        while pending:
+            glyph = pending.pop()
+            data = glyf[loca[glyph]:loca[glyph + 1]]
+            if len(data) < 10 or struct.unpack_from(">h", data, 0)[0] >= 0:
+                continue
+            pos = 10
+            while True:
+                flags, component = struct.unpack_from(">HH", data, pos)
+                if component not in keep:
+                    keep.add(component)
+                    pending.append(component)
+                pos += 4 + (4 if flags & 0x1 else 2)
+                pos += 2 if flags & 0x8 else 4 if flags & 0x40 else 8 if flags & 0x80 else 0
+                if not flags & 0x20:
+                    break
+        new_glyf, new_loca = bytearray(), []
+        for glyph in range(self.num_glyphs):
+            new_loca.append(len(new_glyf))
+            if glyph in keep:
+                new_glyf += glyf[loca[glyph]:loca[glyph + 1]]
+                new_glyf += b"\0" * (-len(new_glyf) % 4)
+        new_loca.append(len(new_glyf))
+        tables = {tag: self.table(tag) for tag in EMBED_TABLES if tag in self.tables}
+        head = bytearray(tables["head"])
+        struct.pack_into(">I", head, 8, 0)
+        struct.pack_into(">h", head, 50, 1)
+        tables["head"] = bytes(head)
+        tables["glyf"] = bytes(new_glyf)
+        tables["loca"] = struct.pack(">%dI" % len(new_loca), *new_loca)
+        return _write_sfnt(tables)
+
+
+_fonts = None
+_fonts_lock = threading.Lock()
+
+
+# Loaded on the first export that needs them; unreadable or CFF-outline fonts are skipped
+def fallback_fonts():
+    global _fonts
+    with _fonts_lock:
+        if _fonts is None:
+            paths = [p for p in os.environ.get("PATHPLANNER_PDF_FONTS", "").split(os.pathsep) if p]
+            _fonts = []
+            for path in paths + FONT_CANDIDATES:
+                if not os.path.exists(path):
+                    continue
+                try:
+                    _fonts.append(TrueTypeFont(path))
+                except (OSError, ValueError, struct.error):
+                    continue
+        return _fonts
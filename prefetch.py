@@ -0,0 +1,137 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from llm_cache import normalize_prompt
+from llm_gateway import background
+from llm_utils import generate_topic_roadmap
+from resource_index import MIN_SCORE
+from tracing import traced
+
+PREFETCH_WORKERS = int(os.environ.get("PATHPLANNER_PREFETCH_WORKERS", "2"))
+# Model calls are the expensive part; only the first few suggested topics are warmed
+MAX_TOPIC_ROADMAPS = int(os.environ.get("PATHPLANNER_PREFETCH_TOPICS", "3"))
+# Topic mode's default duration; other values are speculated once picked on the slider
+TOPIC_ROADMAP_WEEKS = 3
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _shared_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+# 🔗 Best catalog link per topic (same lookup the roadmap view does)
+@traced("prefetch.resource_links")
+def resource_links(resource_index, topics, min_score=MIN_SCORE):
+    topics = list(dict.fromkeys(topics))
+    matches = resource_index.search_batch(topics, k=1, min_score=min_score)
+    return {t: m[0][1] for t, m in zip(topics, matches) if m}
+
+
+def _speculate(fn, *args):
+    with background():
+        return fn(*args)
+
+
+# 🔮 Per-session speculative model calls, keyed by what the next click will ask for.
+# They run in the gateway's background lane, so they never hold up an interactive
+# call. Starting a new goal (or cancel()) drops everything queued for the old one.
+class Prefetcher:
+    def __init__(self, executor=None):
+        self._executor = executor or _shared_executor()
+        self._lock = threading.Lock()
+        self._futures = {}
+        self._started = set()
+        self.goal = None
+        self.speculated = 0
+        self.hits = 0
+        self.misses = 0
+        self.cancelled = 0
+
+    def start(self, goal, tasks):
+        self.cancel()
+        with self._lock:
+            self.goal = goal
+            self._submit(tasks)
+
+    # More speculation for the current goal, next to what is already queued; a key that was
+    # speculated (or claimed) once is not run again
+    def extend(self, tasks):
+        with self._lock:
+            if self.goal is not None:
+                self._submit(tasks)
+
+    def _submit(self, tasks):
+        for key, (fn, args) in tasks.items():
+            if key in self._started:
+                continue
+            self._started.add(key)
+            self._futures[key] = self._executor.submit(_speculate, fn, *args)
+            self.speculated += 1
+
+    def cancel(self):
+        with self._lock:
+            for future in self._futures.values():
+                # Work already running finishes in the background; its result is just dropped
+                if future.cancel():
+                    self.cancelled += 1
+            self._futures.clear()
+            self._started.clear()
+            self.goal = None
+
+    # 🎯 Records whether a speculated call finished before it was needed, without using its
+    # value (topic roadmaps land in the shared LLM cache, which the caller reads on its own).
+    # One that has not started yet is dropped instead of racing the real request.
+    def claim(self, key):
+        with self._lock:
+            future = self._futures.pop(key, None)
+            if future is None:
+                return False
+            if future.cancel():
+                self.cancelled += 1
+            hit = future.done() and not future.cancelled() and future.exception() is None
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+            return hit
+
+    def stats(self):
+        with self._lock:
+            used = self.hits + self.misses
+            return {
+                "goal": self.goal,
+                "speculated": self.speculated,
+                "pending": sum(not f.done() for f in self._futures.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "cancelled": self.cancelled,
+                "hit_rate": round(self.hits / used, 3) if used else 0.0,
+            }
+
+
+# Same key for any spelling the LLM cache treats as one prompt ("Trigonometry " / "trigonometry")
+def topic_roadmap_key(topic, weeks):
+    return ("topic_roadmap", normalize_prompt(topic), weeks)
+
+
+# 🧭 Model calls a follow-up Topic mode visit will most likely need. Step 3's roadmap and
+# catalog links take well under a millisecond, so they are computed when asked for.
+def goal_tasks(topics, topic_roadmap_fn=generate_topic_roadmap, weeks=TOPIC_ROADMAP_WEEKS):
+    return {
+        topic_roadmap_key(topic, weeks): (topic_roadmap_fn, (topic, weeks))
+        for topic in list(topics)[:MAX_TOPIC_ROADMAPS]
+    }
+
+
+# 🎚️ The roadmap for a suggested topic at the duration picked on Topic mode's slider
+def topic_tasks(topic, weeks, suggested, topic_roadmap_fn=generate_topic_roadmap):
+    if normalize_prompt(topic) not in {normalize_prompt(t) for t in suggested}:
+        return {}
+    return {topic_roadmap_key(topic, weeks): (topic_roadmap_fn, (topic, weeks))}
@@ -0,0 +1,194 @@
+import atexit
+import json
+import os
+import threading
+from contextlib import contextmanager
+
+from utils import ProgressIndex, apply_progress_journal, atomic_write_json, file_signature
+from tracing import traced
+
+try:
+    import fcntl
+except ImportError:  # Windows: fall back to in-process locking only
+    fcntl = None
+
+FLUSH_DELAY = 1.0
+COMPACT_EVERY = 500
+
+
+@contextmanager
+def file_lock(lock_path):
+    with open(lock_path, "a") as f:
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# 📝 Write-behind progress store: toggles are coalesced and appended to a journal,
+# which is periodically compacted into progress.json with an atomic rename
+class ProgressStore:
+    def __init__(self, path="progress.json", flush_delay=FLUSH_DELAY, compact_every=COMPACT_EVERY):
+        self.path = path
+        self.journal_path = path + ".journal"
+        self.lock_path = path + ".lock"
+        self.flush_delay = flush_delay
+        self.compact_every = compact_every
+        self.data = {}
+        self.index = ProgressIndex()
+        self.flushes = 0
+        self._dirty = {}
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._main_signature = None
+        self._timer = None
+        self._lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        with self._lock, file_lock(self.lock_path):
+            self._load_locked()
+
+    def _load_locked(self):
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                data = json.load(f)
+        else:
+            data = {}
+        self._main_signature = file_signature(self.path)
+        self._journal_offset = apply_progress_journal(data, self.journal_path)
+        self._journal_entries = self._count_journal_entries()
+        # Changes not yet flushed by this process win over what is on disk
+        for (week_key, topic), done in self._dirty.items():
+            data.setdefault(week_key, {})[topic] = done
+        self.data = data
+        self.index = ProgressIndex.from_progress(data)
+
+    def _count_journal_entries(self):
+        if not os.path.exists(self.journal_path):
+            return 0
+        with open(self.journal_path, "rb") as f:
+            return sum(1 for _ in f)
+
+    # 🔄 Pick up changes other sessions/processes have written since we last looked
+    @traced("progress_store.refresh")
+    def refresh(self):
+        with self._lock:
+            if file_signature(self.path) != self._main_signature:
+                with file_lock(self.lock_path):
+                    self._load_locked()
+                return
+            self._replay_journal()
+
+    def _replay_journal(self):
+        before = self._journal_offset
+        self._journal_offset = apply_progress_journal(
+            self.data, self.journal_path, before, self.index
+        )
+        if self._journal_offset != before:
+            for (week_key, topic), done in self._dirty.items():
+                self._apply(week_key, topic, done)
+
+    def _apply(self, week_key, topic, done):
+        week = self.data.setdefault(week_key, {})
+        self.index.update(week_key, topic, week.get(topic), done)
+        week[topic] = done
+
+    def get(self, week_key):
+        return self.data.get(week_key, {})
+
+    def ensure_week(self, week_key, topics):
+        with self._lock:
+            week = self.data.setdefault(week_key, {})
+            for topic in topics:
+                if topic not in week:
+                    self._mark(week_key, topic, False)
+
+    def set(self, week_key, topic, done):
+        with self._lock:
+            if self.data.get(week_key, {}).get(topic) == done:
+                return
+            self._mark(week_key, topic, done)
+
+    def _mark(self, week_key, topic, done):
+        self._apply(week_key, topic, done)
+        self._dirty[(week_key, topic)] = done
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        if self.flush_delay is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    @traced("progress_store.flush")
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            lines = "".join(
+                json.dumps({"w": week_key, "t": topic, "d": done}) + "\n"
+                for (week_key, topic), done in self._dirty.items()
+            )
+            with file_lock(self.lock_path):
+                # Read what others appended first so our offset stays in step with the file
+                if file_signature(self.path) != self._main_signature:
+                    self._load_locked()
+                else:
+                    self._replay_journal()
+                with open(self.journal_path, "ab") as f:
+                    encoded = lines.encode("utf-8")
+                    f.write(encoded)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_offset += len(encoded)
+                self._journal_entries += len(self._dirty)
+                self._dirty.clear()
+                self.flushes += 1
+                if self._journal_entries >= self.compact_every:
+                    self._compact_locked()
+
+    @traced("progress_store.compact")
+    def compact(self):
+        with self._lock:
+            self.flush()
+            with file_lock(self.lock_path):
+                self._compact_locked()
+
+    def _compact_locked(self):
+        self._load_locked()
+        atomic_write_json(self.data, self.path)
+        open(self.journal_path, "w").close()
+        self._main_signature = file_signature(self.path)
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def close(self):
+        self.flush()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_progress_store(path="progress.json"):
+    with _stores_lock:
+        store = _stores.get(path)
+        if store is None:
+            store = ProgressStore(path)
+            _stores[path] = store
+            atexit.register(store.close)
+        return store
@@ -0,0 +1,229 @@
+import itertools
+import math
+import re
+import threading
+
+import numpy as np
+
+from data_access import load_json
+from tracing import traced
+
+NGRAM = 3
+MIN_SCORE = 0.35
+MAX_DF = 0.1
+MIN_WORD_PREFIX = 4
+# Candidates (by n-gram score) checked for whole-word overlap per requested result
+CANDIDATES_PER_RESULT = 10
+# Candidates scored in one vectorized pass
+SCORE_CHUNK = 50_000
+
+
+def normalize(text):
+    return " " + re.sub(r"[^a-z0-9]+", " ", str(text).lower()).strip() + " "
+
+
+def char_ngrams(text, n=NGRAM):
+    text = normalize(text)
+    return [text[i:i + n] for i in range(len(text) - n + 1)]
+
+
+def words(text):
+    return normalize(text).split()
+
+
+# "trigonometric" ~ "trigonometry", "structure" ~ "structures", but not "number" ~ "numerical"
+def _same_word(a, b):
+    if a == b:
+        return True
+    shorter = min(len(a), len(b))
+    prefix = max(MIN_WORD_PREFIX, math.ceil(0.75 * shorter))
+    return shorter >= prefix and a[:prefix] == b[:prefix]
+
+
+# Words _same_word can pair always share this key
+def word_key(word):
+    return word[:MIN_WORD_PREFIX]
+
+
+# A catalog entry only matches a topic that mentions every word of its name: shared n-grams
+# alone pair "Number Systems" with "Operating Systems" and "Structure of the Atom" with
+# "Data Structures"
+def covers(query_words, name_words):
+    return all(any(_same_word(w, q) for q in query_words) for w in name_words)
+
+
+# 🔎 Character n-gram TF-IDF index over the resource catalog. Postings are stored term-major
+# (CSR) to find the documents sharing a query's n-grams, and doc-major to score just those
+# candidates; a word-prefix index narrows whole-word searches to the names a query can cover.
+class ResourceIndex:
+    def __init__(self, catalog, max_df=MAX_DF):
+        self.names = list(catalog.keys())
+        self.urls = [catalog[name] for name in self.names]
+        self.words = [words(name) for name in self.names]
+        self.vocab = {}
+        self.key_vocab = {}
+        n_docs = len(self.names)
+
+        doc_ids, term_ids, counts = [], [], []
+        key_docs, key_ids = [], []
+        for doc_id, name in enumerate(self.names):
+            grams = {}
+            for gram in char_ngrams(name):
+                term = self.vocab.setdefault(gram, len(self.vocab))
+                grams[term] = grams.get(term, 0) + 1
+            doc_ids.extend([doc_id] * len(grams))
+            term_ids.extend(grams.keys())
+            counts.extend(grams.values())
+            keys = {self.key_vocab.setdefault(word_key(w), len(self.key_vocab)) for w in self.words[doc_id]}
+            key_docs.extend([doc_id] * len(keys))
+            key_ids.extend(keys)
+
+        doc_ids = np.asarray(doc_ids, dtype=np.int32)
+        term_ids = np.asarray(term_ids, dtype=np.int32)
+        tf = 1.0 + np.log(np.asarray(counts, dtype=np.float32))
+        df = np.bincount(term_ids, minlength=len(self.vocab))
+        self.idf = (np.log((n_docs + 1) / (df + 1)) + 1.0).astype(np.float32)
+        weights = tf * self.idf[term_ids]
+        norms = np.sqrt(np.bincount(doc_ids, weights=weights * weights, minlength=n_docs))
+        weights = (weights / np.maximum(norms[doc_ids], 1e-12)).astype(np.float32)
+
+        # Doc-major: the build loop already emits postings in document order
+        self.doc_terms = term_ids.astype(np.int64)
+        self.doc_weights = weights
+        self.doc_ptr = np.zeros(n_docs + 1, dtype=np.int64)
+        np.cumsum(np.bincount(doc_ids, minlength=n_docs), out=self.doc_ptr[1:])
+
+        order = np.argsort(term_ids, kind="stable")
+        self.post_docs = doc_ids[order]
+        self.term_ptr = np.zeros(len(self.vocab) + 1, dtype=np.int64)
+        np.cumsum(df, out=self.term_ptr[1:])
+        # Very common n-grams carry almost no signal but dominate query cost
+        self.skip_terms = df > max(max_df * n_docs, 50)
+
+        key_docs = np.asarray(key_docs, dtype=np.int32)
+        key_ids = np.asarray(key_ids, dtype=np.int32)
+        self.key_docs = key_docs[np.argsort(key_ids, kind="stable")]
+        self.key_ptr = np.zeros(len(self.key_vocab) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(key_ids, minlength=len(self.key_vocab)), out=self.key_ptr[1:])
+        # Distinct word keys per name: a name is covered when the query supplies all of them
+        self.key_counts = np.bincount(key_docs, minlength=n_docs)
+        self.n_docs = n_docs
+
+    def _query_terms(self, query):
+        grams = {}
+        for gram in char_ngrams(query):
+            grams[gram] = grams.get(gram, 0) + 1
+        known = [(self.vocab[g], c) for g, c in grams.items() if g in self.vocab]
+        # n-grams the catalog has never seen still count towards the query's length
+        unseen_idf = math.log(self.n_docs + 1) + 1.0
+        unseen = sum((1.0 + math.log(c)) ** 2 for g, c in grams.items() if g not in self.vocab)
+        if not known:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        terms = np.fromiter((t for t, _ in known), dtype=np.int64, count=len(known))
+        counts = np.fromiter((c for _, c in known), dtype=np.float32, count=len(known))
+        weights = (1.0 + np.log(counts)) * self.idf[terms]
+        weights /= math.sqrt(float(np.dot(weights, weights)) + unseen * unseen_idf ** 2)
+        keep = ~self.skip_terms[terms]
+        return terms[keep], weights[keep]
+
+    @staticmethod
+    def _gather(docs, ptr, ids):
+        if not len(ids):
+            return np.zeros(0, dtype=docs.dtype)
+        return np.concatenate([docs[s:e] for s, e in zip(ptr[ids].tolist(), ptr[ids + 1].tolist())])
+
+    # Names whose every word key appears in the query (a superset of the names covers() accepts)
+    def _covered_docs(self, query):
+        keys = {word_key(w) for w in words(query)}
+        ids = np.fromiter((self.key_vocab[k] for k in keys if k in self.key_vocab), dtype=np.int64)
+        docs, hits = np.unique(self._gather(self.key_docs, self.key_ptr, ids), return_counts=True)
+        return docs[hits == self.key_counts[docs]]
+
+    # Cosine scores for each (query, candidate) pair, summed over the candidates' own postings
+    def _score(self, cand_queries, cand_docs, query_terms, query_weights):
+        vocab = len(self.vocab)
+        q_keys = np.concatenate([i * vocab + t for i, t in enumerate(query_terms)])
+        q_weights = np.concatenate(query_weights)
+        order = np.argsort(q_keys)
+        q_keys, q_weights = q_keys[order], q_weights[order]
+        starts = self.doc_ptr[cand_docs]
+        lengths = self.doc_ptr[cand_docs + 1] - starts
+        offsets = np.cumsum(lengths) - lengths
+        positions = np.repeat(starts - offsets, lengths) + np.arange(int(lengths.sum()))
+        keys = np.repeat(cand_queries, lengths) * vocab + self.doc_terms[positions]
+        slots = np.minimum(np.searchsorted(q_keys, keys), len(q_keys) - 1)
+        contrib = np.where(q_keys[slots] == keys, self.doc_weights[positions] * q_weights[slots], 0.0)
+        owner = np.repeat(np.arange(len(cand_docs)), lengths)
+        return np.bincount(owner, weights=contrib, minlength=len(cand_docs))
+
+    def search(self, query, k=3, min_score=0.0, whole_words=True):
+        return self.search_batch([query], k, min_score, whole_words)[0]
+
+    # ⚡ Candidates per query (names its words cover, or with whole_words=False any name sharing
+    # a non-trivial n-gram), then one scoring pass over all candidates of the batch and top-k
+    @traced("resource_index.search_batch")
+    def search_batch(self, queries, k=3, min_score=0.0, whole_words=True):
+        queries = list(queries)
+        if not queries:
+            return []
+        query_terms, query_weights, candidates = [], [], []
+        for query in queries:
+            terms, q_weights = self._query_terms(query)
+            query_terms.append(terms)
+            query_weights.append(q_weights)
+            if not len(terms):
+                candidates.append(np.zeros(0, dtype=np.int32))
+            elif whole_words:
+                candidates.append(self._covered_docs(query))
+            else:
+                candidates.append(np.unique(self._gather(self.post_docs, self.term_ptr, terms)))
+        sizes = [len(c) for c in candidates]
+        cand_docs = np.concatenate(candidates).astype(np.int64)
+        cand_queries = np.repeat(np.arange(len(queries)), sizes)
+        bounds = np.cumsum([0] + sizes).tolist()
+        # Scored a few queries at a time so a batch of broad queries stays small in memory
+        scores = np.zeros(len(cand_docs))
+        first = 0
+        while first < len(queries):
+            last = first + 1
+            while last < len(queries) and bounds[last + 1] - bounds[first] <= SCORE_CHUNK:
+                last += 1
+            lo, hi = bounds[first], bounds[last]
+            if hi > lo:
+                scores[lo:hi] = self._score(cand_queries[lo:hi] - first, cand_docs[lo:hi],
+                                            query_terms[first:last], query_weights[first:last])
+            first = last
+
+        results = []
+        for i, query in enumerate(queries):
+            docs, doc_scores = cand_docs[bounds[i]:bounds[i + 1]], scores[bounds[i]:bounds[i + 1]]
+            keep = np.flatnonzero(doc_scores > min_score)
+            pool = k * CANDIDATES_PER_RESULT if whole_words else k
+            if len(keep) > pool:
+                keep = keep[np.argpartition(doc_scores[keep], len(keep) - pool)[-pool:]]
+                keep.sort()
+            ranked = keep[np.argsort(-doc_scores[keep], kind="stable")].tolist()
+            if whole_words:
+                query_words = words(query)
+                ranked = (j for j in ranked if covers(query_words, self.words[docs[j]]))
+            results.append([
+                (self.names[d], self.urls[d], round(float(doc_scores[j]), 4))
+                for j, d in ((j, int(docs[j])) for j in itertools.islice(ranked, k))
+            ])
+        return results
+
+
+_index = None
+_index_source = None
+_index_lock = threading.Lock()
+
+
+def get_resource_index(path="resources_db.json"):
+    global _index, _index_source
+    catalog = load_json(path)
+    with _index_lock:
+        # data_access hands back the same object until the file changes on disk
+        if _index is None or _index_source is not catalog:
+            _index = ResourceIndex(catalog)
+            _index_source = catalog
+        return _index
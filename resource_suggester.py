@@ -1,25 +1,270 @@
-import requests
-from bs4 import BeautifulSoup
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
+from html.parser import HTMLParser
+from urllib.parse import parse_qs, urlparse
 
-# Simple DuckDuckGo scrape to simulate YouTube search without needing API key
-def fetch_youtube_links(query):
-    search_query = query + " site:youtube.com"
-    url = f"https://html.duckduckgo.com/html/?q={search_query}"
+from tracing import traced
 
-    headers = {
-        "User-Agent": "Mozilla/5.0"
-    }
+SEARCH_URL = os.environ.get("PATHPLANNER_SEARCH_URL", "https://html.duckduckgo.com/html/")
+HEADERS = {
+    "User-Agent": "Mozilla/5.0"
+}
+POOL_SIZE = 8
+CACHE_TTL = float(os.environ.get("PATHPLANNER_SEARCH_TTL", "3600"))
+NEGATIVE_TTL = float(os.environ.get("PATHPLANNER_SEARCH_NEGATIVE_TTL", "120"))
+CACHE_ENTRIES = 2048
 
-    try:
-        res = requests.get(url, headers=headers, timeout=10)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        results = []
-        for link in soup.find_all('a', href=True):
-            href = link['href']
-            if "youtube.com/watch" in href:
-                text = link.get_text().strip()
-                if text and len(results) < 3:
-                    results.append((text[:60], href))
+_session = None
+_session_lock = threading.Lock()
+
+
+# 🔌 One pooled HTTP session shared by every lookup (keeps TLS connections alive)
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            _session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+            _session.headers.update(HEADERS)
+        return _session
+
+
+# 🐢 Reference parser: builds the whole BeautifulSoup tree (kept for benchmarks and comparison)
+@traced()
+def parse_youtube_links(html, limit=3):
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    results = []
+    for link in soup.find_all('a', href=True):
+        href = link['href']
+        if "youtube.com/watch" in href:
+            text = link.get_text().strip()
+            if text and len(results) < limit:
+                results.append((text[:60], href))
+    return results
+
+
+def _unwrap_redirect(href):
+    # DuckDuckGo wraps result links as //duckduckgo.com/l/?uddg=<encoded target>
+    if "uddg=" in href:
+        target = parse_qs(urlparse(href).query).get("uddg")
+        if target:
+            return target[0]
+    return href
+
+
+class _StopParsing(Exception):
+    pass
+
+
+# ⚡ Incremental link extractor: fed chunk by chunk, stops as soon as it has `limit` links
+class YouTubeLinkExtractor(HTMLParser):
+    def __init__(self, limit=3):
+        super().__init__(convert_charrefs=True)
+        self.limit = limit
+        self.results = []
+        self._seen = set()
+        self._href = None
+        self._text = []
+
+    @property
+    def done(self):
+        return len(self.results) >= self.limit
+
+    def handle_starttag(self, tag, attrs):
+        if tag != "a":
+            return
+        href = _unwrap_redirect(dict(attrs).get("href") or "")
+        # Title and URL anchors of one result point at the same video; keep the first
+        if "youtube.com/watch" in href and href not in self._seen:
+            self._href = href
+            self._text = []
+
+    def handle_data(self, data):
+        if self._href is not None:
+            self._text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag != "a" or self._href is None:
+            return
+        text = "".join(self._text).strip()
+        if text:
+            self.results.append((text[:60], self._href))
+            self._seen.add(self._href)
+        self._href = None
+        if self.done:
+            raise _StopParsing
+
+    def feed(self, data):
+        if self.done:
+            return
+        try:
+            super().feed(data)
+        except _StopParsing:
+            pass
+
+
+@traced()
+def extract_youtube_links(html, limit=3, chunk_size=8192):
+    extractor = YouTubeLinkExtractor(limit)
+    for start in range(0, len(html), chunk_size):
+        extractor.feed(html[start:start + chunk_size])
+        if extractor.done:
+            break
+    return extractor.results
+
+
+# 🧩 A search backend. lookup() adds a TTL cache in front of search(); failures
+# and empty answers are cached for a shorter negative_ttl so a dead provider is not hammered.
+class SearchProvider:
+    name = "provider"
+
+    def __init__(self, priority=100, ttl=CACHE_TTL, negative_ttl=NEGATIVE_TTL, max_entries=CACHE_ENTRIES):
+        self.priority = priority
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+
+    def search(self, query, limit, timeout):
+        raise NotImplementedError
+
+    def lookup(self, query, limit=3, timeout=10):
+        key = (query, limit)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is not None and entry[0] > now:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return list(entry[1])
+            self.misses += 1
+        try:
+            results = self.search(query, limit, timeout)
+        except Exception:
+            with self._lock:
+                self.failures += 1
+            results = []
+        ttl = self.ttl if results else self.negative_ttl
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, tuple(results))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
         return results
-    except:
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self):
+        with self._lock:
+            return {"name": self.name, "priority": self.priority, "entries": len(self._cache),
+                    "hits": self.hits, "misses": self.misses, "failures": self.failures}
+
+
+# 🦆 DuckDuckGo HTML results, read as a stream and abandoned once enough links are found
+class DuckDuckGoProvider(SearchProvider):
+    name = "duckduckgo"
+
+    def __init__(self, url=None, suffix=" site:youtube.com", **kwargs):
+        super().__init__(**kwargs)
+        self.url = url
+        self.suffix = suffix
+
+    def search(self, query, limit, timeout):
+        res = get_session().get(self.url or SEARCH_URL, params={"q": query + self.suffix},
+                                timeout=timeout, stream=True)
+        try:
+            res.raise_for_status()
+            res.encoding = res.encoding or "utf-8"
+            extractor = YouTubeLinkExtractor(limit)
+            for chunk in res.iter_content(chunk_size=8192, decode_unicode=True):
+                extractor.feed(chunk)
+                if extractor.done:
+                    break
+            return extractor.results
+        finally:
+            res.close()
+
+
+# 🥇 Several providers asked in priority order (lowest first) until `limit` distinct links are found
+class ProviderChain:
+    def __init__(self, providers=()):
+        self.providers = sorted(providers, key=lambda p: p.priority)
+
+    def add(self, provider):
+        self.providers = sorted(self.providers + [provider], key=lambda p: p.priority)
+
+    def search(self, query, limit=3, timeout=10):
+        results = []
+        seen = set()
+        for provider in self.providers:
+            for text, href in provider.lookup(query, limit, timeout):
+                if href not in seen:
+                    seen.add(href)
+                    results.append((text, href))
+            if len(results) >= limit:
+                break
+        return results[:limit]
+
+    def stats(self):
+        return [p.stats() for p in self.providers]
+
+
+_chain = None
+_chain_lock = threading.Lock()
+
+
+def get_provider_chain():
+    global _chain
+    with _chain_lock:
+        if _chain is None:
+            _chain = ProviderChain([DuckDuckGoProvider(priority=10)])
+        return _chain
+
+
+def set_provider_chain(chain):
+    global _chain
+    with _chain_lock:
+        _chain = chain
+
+
+# Simple DuckDuckGo scrape to simulate YouTube search without needing API key
+@traced()
+def fetch_youtube_links(query, timeout=10, limit=3):
+    return get_provider_chain().search(query, limit, timeout)
+
+
+# ⚡ Fetch links for many queries at once; results come back in input order
+@traced()
+def fetch_youtube_links_batch(queries, max_workers=POOL_SIZE, deadline=15, timeout=10):
+    queries = list(queries)
+    if not queries:
         return []
+    start = time.monotonic()
+    results = [[] for _ in queries]
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(queries)))
+    try:
+        futures = {
+            executor.submit(fetch_youtube_links, q, min(timeout, deadline)): i
+            for i, q in enumerate(queries)
+        }
+        done, _ = wait(futures, timeout=max(deadline - (time.monotonic() - start), 0))
+        for future in done:
+            results[futures[future]] = future.result()
+    finally:
+        # Anything still running past the deadline is abandoned, not waited for
+        executor.shutdown(wait=False, cancel_futures=True)
+    return results
@@ -1,15 +1,32 @@
-def generate_roadmap(topics, weeks, user_goal=None):
+from goal_matcher import get_goal_matcher, CONFIDENCE_THRESHOLD
+from scheduler import schedule
+from tracing import traced
+
+
+@traced()
+def generate_roadmap(topics, weeks, user_goal=None, efforts=None, prereqs=None):
     roadmap = {}
 
     if user_goal:
-        goal_lower = user_goal.lower()
-        if "gate" in goal_lower:
+        try:
+            matcher = get_goal_matcher()
+            match = matcher.match(user_goal)
+        except FileNotFoundError:
+            match = None
+        # Only a hint for the topic order, so a goal that names the track is enough
+        # even when the rest of it ("Mechanical Engineering") drags the confidence down
+        track = None
+        if match and (match.confidence >= CONFIDENCE_THRESHOLD or matcher.names(user_goal, match.track)):
+            track = match.track
+        if track == "gate":
             topics = sorted(topics)
-        elif "class 10" in goal_lower or "cbse" in goal_lower:
-            topics = topics
-        elif "ml" in goal_lower or "machine learning" in goal_lower:
+        elif track == "machine learning":
             topics = topics[::-1]
 
+    # With effort estimates or prerequisites, hand over to the load-balancing scheduler
+    if efforts or prereqs:
+        return schedule(topics, weeks, efforts, prereqs)
+
     total_topics = len(topics)
     topics_per_week = total_topics // weeks
     remainder = total_topics % weeks
@@ -0,0 +1,143 @@
+import heapq
+
+from tracing import traced
+
+DEFAULT_EFFORT = 1.0
+MAX_SKIPS = 32
+
+
+# The inputs cannot be scheduled (bad week count, prerequisite cycle)
+class ScheduleError(ValueError):
+    pass
+
+
+def _prepare(topics, efforts, prereqs):
+    index = {t: i for i, t in enumerate(topics)}
+    effort = [float((efforts or {}).get(t, DEFAULT_EFFORT)) for t in topics]
+    children = [[] for _ in topics]
+    indegree = [0] * len(topics)
+    for topic, required in (prereqs or {}).items():
+        if topic not in index:
+            continue
+        for req in required:
+            # Prerequisites outside this plan (or already done) are treated as satisfied
+            if req in index and req != topic:
+                children[index[req]].append(index[topic])
+                indegree[index[topic]] += 1
+    return effort, children, indegree
+
+
+def _priorities(effort, children, indegree):
+    # Kahn's algorithm for a topological order, then longest remaining chain of effort per topic
+    order = []
+    pending = list(indegree)
+    stack = [i for i, d in enumerate(pending) if d == 0]
+    while stack:
+        i = stack.pop()
+        order.append(i)
+        for c in children[i]:
+            pending[c] -= 1
+            if pending[c] == 0:
+                stack.append(c)
+    if len(order) != len(effort):
+        raise ScheduleError("prerequisites contain a cycle")
+    chain = list(effort)
+    for i in reversed(order):
+        if children[i]:
+            chain[i] = effort[i] + max(chain[c] for c in children[i])
+    return chain
+
+
+def _pack(effort, children, indegree, chain, weeks, capacity, overflow=True):
+    remaining_in = list(indegree)
+    # Longest dependent chain first, then original topic order
+    ready = [(-chain[i], i) for i, d in enumerate(indegree) if d == 0]
+    heapq.heapify(ready)
+    plan = []
+    placed = 0
+    for week in range(weeks):
+        load = 0.0
+        items = []
+        deferred = []
+        skips = 0
+        # With overflow on, the final week takes whatever is left so nothing is dropped; only
+        # there (a prerequisite chain longer than the plan) can a topic share a week with its
+        # prerequisite. Everywhere else dependents become ready when the week closes.
+        take_all = overflow and week == weeks - 1
+        unlocked = []
+        while ready and (skips < MAX_SKIPS or take_all):
+            priority, i = heapq.heappop(ready)
+            if items and load + effort[i] > capacity and not take_all:
+                deferred.append((priority, i))
+                skips += 1
+                continue
+            items.append(i)
+            load += effort[i]
+            placed += 1
+            for c in children[i]:
+                remaining_in[c] -= 1
+                if remaining_in[c] == 0:
+                    if take_all:
+                        heapq.heappush(ready, (-chain[c], c))
+                    else:
+                        unlocked.append((-chain[c], c))
+        for entry in deferred + unlocked:
+            heapq.heappush(ready, entry)
+        plan.append(items)
+    return plan, placed
+
+
+# 📐 Topologically valid week plan with balanced weekly load.
+# The weekly capacity is the smallest one (found by binary search) that fits every topic into `weeks`.
+@traced("scheduler.schedule")
+def schedule(topics, weeks, efforts=None, prereqs=None, capacity=None, start_week=1):
+    topics = list(topics)
+    if weeks < 1:
+        raise ScheduleError("weeks must be at least 1")
+    effort, children, indegree = _prepare(topics, efforts, prereqs)
+    chain = _priorities(effort, children, indegree)
+
+    if capacity is None and topics:
+        low = max(sum(effort) / weeks, max(effort))
+        high = sum(effort)
+        # The critical path can never be split below one topic per week
+        if weeks > 1:
+            low = max(low, max(chain) / weeks)
+        for _ in range(20):
+            if high - low <= max(low * 0.01, 1e-9):
+                break
+            mid = (low + high) / 2
+            if _pack(effort, children, indegree, chain, weeks, mid, overflow=False)[1] == len(topics):
+                high = mid
+            else:
+                low = mid
+        capacity = high
+
+    plan, _ = _pack(effort, children, indegree, chain, weeks, capacity or 0.0)
+    return {f"Week {start_week + w}": [topics[i] for i in items] for w, items in enumerate(plan)}
+
+
+# 🔁 Re-plan what is left after some topics are marked done
+@traced("scheduler.replan")
+def replan(roadmap, done, weeks_left, efforts=None, prereqs=None, start_week=1):
+    done = set(done)
+    remaining = [t for topics in roadmap.values() for t in topics if t not in done]
+    return schedule(remaining, weeks_left, efforts, prereqs, start_week=start_week)
+
+
+def week_loads(roadmap, efforts=None):
+    efforts = efforts or {}
+    return {week: sum(efforts.get(t, DEFAULT_EFFORT) for t in topics) for week, topics in roadmap.items()}
+
+
+# Every prerequisite in an earlier week than the topic that needs it
+def validate(roadmap, prereqs):
+    week_of = {}
+    for week, topics in enumerate(roadmap.values()):
+        for t in topics:
+            week_of[t] = week
+    for topic, required in (prereqs or {}).items():
+        for req in required:
+            if topic in week_of and req in week_of and req != topic and week_of[req] >= week_of[topic]:
+                return False
+    return True
@@ -0,0 +1,121 @@
+import os
+import re
+import time
+
+import tracing
+from answer_cache import get_answer_cache
+from llm_gateway import get_gateway
+from llm_utils import MODEL, TUTOR_PROMPT
+from model_router import keep_alive_for
+
+TOKEN_BUDGET = int(os.environ.get("PATHPLANNER_CHAT_BUDGET", "1200"))
+SUMMARY_BUDGET = int(os.environ.get("PATHPLANNER_CHAT_SUMMARY_BUDGET", "200"))
+# Keeps the model (and its cache of the shared prompt prefix) loaded between turns
+KEEP_ALIVE = keep_alive_for(MODEL)
+
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for budgeting English prompts
+    return len(text) // 4 + 1
+
+
+def _gist(text, limit=160):
+    text = " ".join(text.split())
+    sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+    return sentence if len(sentence) <= limit else sentence[:limit - 1] + "…"
+
+
+# 💬 One StudyBot conversation. Recent turns are sent verbatim; older ones are folded into
+# a short rolling summary so the prompt stays under the token budget.
+class ChatSession:
+    def __init__(self, budget=TOKEN_BUDGET, summary_budget=SUMMARY_BUDGET, keep_alive=KEEP_ALIVE):
+        self.budget = budget
+        self.summary_budget = summary_budget
+        self.keep_alive = keep_alive
+        self.reset()
+
+    def reset(self):
+        self.turns = []
+        self.window_start = 0
+        self.summary = []
+        self.turn_stats = []
+
+    def _window_tokens(self, query):
+        total = estimate_tokens(TUTOR_PROMPT) + estimate_tokens(query)
+        total += sum(estimate_tokens(line) for line in self.summary)
+        for question, answer in self.turns[self.window_start:]:
+            total += estimate_tokens(question) + estimate_tokens(answer)
+        return total
+
+    def _compact(self, query):
+        if self._window_tokens(query) <= self.budget:
+            return
+        # Fold down to half the budget at once, so the shared prefix (and the model's
+        # cached context for it) changes once every few turns rather than on every turn
+        while self.window_start < len(self.turns) and self._window_tokens(query) > self.budget // 2:
+            question, answer = self.turns[self.window_start]
+            self.summary.append(f"- Student asked: {_gist(question, 100)} Tutor: {_gist(answer)}")
+            self.window_start += 1
+        while len(self.summary) > 1 and sum(estimate_tokens(line) for line in self.summary) > self.summary_budget:
+            self.summary.pop(0)
+
+    def build_messages(self, query):
+        self._compact(query)
+        messages = [{"role": "system", "content": TUTOR_PROMPT}]
+        if self.summary:
+            messages.append({"role": "system", "content": "Earlier in this conversation:\n" + "\n".join(self.summary)})
+        for question, answer in self.turns[self.window_start:]:
+            messages.append({"role": "user", "content": question})
+            messages.append({"role": "assistant", "content": answer})
+        messages.append({"role": "user", "content": query})
+        return messages
+
+    # 📡 Streams the answer; the turn is recorded once the stream finishes
+    def ask_stream(self, query, use_cache=True):
+        # Only an opening question means the same thing regardless of the conversation,
+        # so only those are answered from (and stored in) the shared answer cache
+        standalone = use_cache and not self.turns
+        if standalone:
+            start = time.perf_counter()
+            cached = get_answer_cache().lookup(query)
+            if cached is not None:
+                yield cached["answer"]
+                self._record(query, cached["answer"], 0, None, None, time.perf_counter() - start, cached=True)
+                return
+
+        messages = self.build_messages(query)
+        prompt_tokens = sum(estimate_tokens(m["content"]) for m in messages)
+        start = time.perf_counter()
+        first_token = None
+        parts = []
+        final = {}
+        stream = get_gateway().chat_stream(model=MODEL, messages=messages, keep_alive=self.keep_alive)
+        for chunk in stream:
+            piece = chunk["message"]["content"]
+            if piece and first_token is None:
+                first_token = time.perf_counter() - start
+            if chunk.get("done"):
+                final = chunk
+            parts.append(piece)
+            yield piece
+        total = time.perf_counter() - start
+        answer = "".join(parts)
+        if standalone:
+            get_answer_cache().put(query, answer)
+        self._record(query, answer, prompt_tokens, final.get("prompt_eval_count"), first_token, total)
+
+    def _record(self, query, answer, prompt_tokens, evaluated, first_token, total, cached=False):
+        self.turns.append((query, answer))
+        self.turn_stats.append({
+            "turn": len(self.turns),
+            "prompt_tokens": prompt_tokens,
+            # Reported by Ollama: only tokens it had to evaluate, so prefix reuse shows up here
+            "evaluated_tokens": evaluated,
+            "first_token_ms": round((first_token or total) * 1000, 1),
+            "total_ms": round(total * 1000, 1),
+            "summarized_turns": self.window_start,
+            "cached": cached,
+        })
+        if tracing.ENABLED:
+            tracing.observe("studybot.turn", total)
+            tracing.observe("studybot.first_token", first_token or total)
@@ -0,0 +1,177 @@
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# 🩺 Per-stage latency tracing. Off by default; set PATHPLANNER_TRACE=1 or call enable().
+ENABLED = os.environ.get("PATHPLANNER_TRACE", "") not in ("", "0", "false")
+WINDOW = 2048
+QUANTILES = (0.5, 0.95, 0.99)
+
+_histograms = {}
+_lock = threading.Lock()
+_NULL_SPAN = nullcontext()
+
+
+def enable(flag=True):
+    global ENABLED
+    ENABLED = flag
+
+
+# 📈 Rolling window of recent durations plus lifetime count/sum
+class Histogram:
+    def __init__(self, window=WINDOW):
+        self.samples = deque(maxlen=window)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+
+    def observe(self, seconds, error=False):
+        self.samples.append(seconds)
+        self.count += 1
+        self.total += seconds
+        if error:
+            self.errors += 1
+
+    def quantiles(self, qs=QUANTILES):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return {q: 0.0 for q in qs}
+        return {q: ordered[min(int(q * len(ordered)), len(ordered) - 1)] for q in qs}
+
+
+def observe(name, seconds, error=False):
+    with _lock:
+        hist = _histograms.get(name)
+        if hist is None:
+            hist = _histograms[name] = Histogram()
+        hist.observe(seconds, error)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        observe(self.name, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+def span(name):
+    if not ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+# ⏱️ Decorator form; generator functions are timed from first to last item
+def traced(name=None):
+    def decorate(fn):
+        span_name = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        if inspect.isgeneratorfunction(fn):
+            @functools.wraps(fn)
+            def gen_wrapper(*args, **kwargs):
+                if not ENABLED:
+                    return (yield from fn(*args, **kwargs))
+                with _Span(span_name):
+                    return (yield from fn(*args, **kwargs))
+            return gen_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return fn(*args, **kwargs)
+            with _Span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def snapshot():
+    with _lock:
+        items = list(_histograms.items())
+    result = {}
+    for name, hist in sorted(items):
+        qs = hist.quantiles()
+        result[name] = {
+            "count": hist.count,
+            "errors": hist.errors,
+            "sum_s": round(hist.total, 6),
+            "p50_ms": round(qs[0.5] * 1000, 3),
+            "p95_ms": round(qs[0.95] * 1000, 3),
+            "p99_ms": round(qs[0.99] * 1000, 3),
+        }
+    return result
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# 📤 Prometheus text exposition format (summary metric per span)
+def render_prometheus():
+    with _lock:
+        items = sorted(_histograms.items())
+    lines = [
+        "# HELP pathplanner_span_seconds Duration of traced PathPlanner.AI stages.",
+        "# TYPE pathplanner_span_seconds summary",
+    ]
+    errors = []
+    for name, hist in items:
+        label = name.replace("\\", "\\\\").replace('"', '\\"')
+        for q, value in hist.quantiles().items():
+            lines.append(f'pathplanner_span_seconds{{span="{label}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'pathplanner_span_seconds_sum{{span="{label}"}} {hist.total:.6f}')
+        lines.append(f'pathplanner_span_seconds_count{{span="{label}"}} {hist.count}')
+        errors.append(f'pathplanner_span_errors_total{{span="{label}"}} {hist.errors}')
+    lines += [
+        "# HELP pathplanner_span_errors_total Traced calls that raised.",
+        "# TYPE pathplanner_span_errors_total counter",
+    ] + errors
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        f.write(render_prometheus())
+    os.replace(tmp_path, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+_server = None
+
+
+def serve_metrics(port=9108, host="127.0.0.1"):
+    global _server
+    if _server is None:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        _server.daemon_threads = True
+        threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return _server
@@ -0,0 +1,275 @@
+import argparse
+import atexit
+import hashlib
+import json
+import os
+import re
+import threading
+
+from progress_store import COMPACT_EVERY, FLUSH_DELAY, file_lock
+from utils import (
+    ProgressIndex, atomic_write_json, file_signature, iter_progress_journal, load_progress, split_week_key,
+)
+from tracing import traced
+
+ROOT = os.environ.get("PATHPLANNER_PROGRESS_DIR", "progress_users")
+DEFAULT_USER = "default"
+
+
+def user_shard_path(user, root=ROOT):
+    digest = hashlib.sha1(user.encode("utf-8")).hexdigest()
+    slug = re.sub(r"[^a-z0-9_-]+", "-", user.lower()).strip("-")[:40] or "user"
+    return os.path.join(root, digest[:2], f"{slug}-{digest[:10]}.json")
+
+
+# 👤 One user's progress: topic names interned once per user, completion kept as a
+# bitmask per week. Each user lives in their own shard file, so loading a user
+# reads only that user's data. Like ProgressStore, toggles are appended to a
+# per-shard journal and folded into the shard every compact_every entries.
+class UserProgressStore:
+    def __init__(self, user, root=ROOT, flush_delay=FLUSH_DELAY, compact_every=COMPACT_EVERY):
+        self.user = user
+        self.path = user_shard_path(user, root)
+        self.journal_path = self.path + ".journal"
+        self.lock_path = self.path + ".lock"
+        self.flush_delay = flush_delay
+        self.compact_every = compact_every
+        self.flushes = 0
+        self._dirty = {}
+        self._timer = None
+        self._signature = None
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._lock = threading.RLock()
+        self._reset()
+        self.load()
+
+    def _reset(self):
+        self.topics = []
+        self.topic_ids = {}
+        self.weeks = {}
+        self.index = ProgressIndex()
+
+    def _intern(self, topic):
+        topic_id = self.topic_ids.get(topic)
+        if topic_id is None:
+            topic_id = self.topic_ids[topic] = len(self.topics)
+            self.topics.append(topic)
+        return topic_id
+
+    @traced("user_progress.load")
+    def load(self):
+        with self._lock:
+            if os.path.exists(self.path) or os.path.exists(self.journal_path):
+                with file_lock(self.lock_path):
+                    self._load_locked()
+            else:
+                self._reset()
+                self._apply_dirty()
+
+    def _load_locked(self):
+        raw = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                raw = json.load(f)
+        self._signature = file_signature(self.path)
+        self._reset()
+        self.topics = raw.get("topics", [])
+        self.topic_ids = {t: i for i, t in enumerate(self.topics)}
+        for goal, weeks in raw.get("goals", {}).items():
+            for week, (ids, mask_hex) in weeks.items():
+                week_key = f"{goal}_{week}" if week else goal
+                mask = int(mask_hex, 16)
+                self.weeks[week_key] = [list(ids), mask]
+                counts = self.index.goals.setdefault(goal, [0, 0])
+                counts[0] += bin(mask).count("1")
+                counts[1] += len(ids)
+        self._journal_offset = 0
+        self._journal_entries = 0
+        self._read_journal()
+        self._apply_dirty()
+
+    def _read_journal(self):
+        before = self._journal_offset
+        for offset, entry in iter_progress_journal(self.journal_path, before):
+            self._journal_offset = offset
+            self._journal_entries += 1
+            if entry is not None:
+                self._apply(entry["w"], entry["t"], entry["d"])
+        return self._journal_offset != before
+
+    def _replay_journal(self):
+        if self._read_journal():
+            self._apply_dirty()
+
+    # Our unflushed changes win over what another session wrote
+    def _apply_dirty(self):
+        for (week_key, topic), done in self._dirty.items():
+            self._apply(week_key, topic, done)
+
+    def _serialize(self):
+        goals = {}
+        for week_key, (ids, mask) in self.weeks.items():
+            goal, week = split_week_key(week_key)
+            goals.setdefault(goal, {})[week] = [ids, format(mask, "x")]
+        return {"version": 1, "user": self.user, "topics": self.topics, "goals": goals}
+
+    def refresh(self):
+        with self._lock:
+            if file_signature(self.path) != self._signature and os.path.exists(self.path):
+                with file_lock(self.lock_path):
+                    self._load_locked()
+                return
+            self._replay_journal()
+
+    def _apply(self, week_key, topic, done):
+        topic_id = self._intern(topic)
+        week = self.weeks.setdefault(week_key, [[], 0])
+        try:
+            pos = week[0].index(topic_id)
+            old = bool(week[1] >> pos & 1)
+        except ValueError:
+            pos = len(week[0])
+            week[0].append(topic_id)
+            old = None
+        if done:
+            week[1] |= 1 << pos
+        else:
+            week[1] &= ~(1 << pos)
+        self.index.update(week_key, topic, old, done)
+
+    def get(self, week_key):
+        ids, mask = self.weeks.get(week_key, ([], 0))
+        return {self.topics[topic_id]: bool(mask >> pos & 1) for pos, topic_id in enumerate(ids)}
+
+    @property
+    def data(self):
+        return {week_key: self.get(week_key) for week_key in self.weeks}
+
+    def ensure_week(self, week_key, topics):
+        with self._lock:
+            known = self.get(week_key)
+            for topic in topics:
+                if topic not in known:
+                    self._mark(week_key, topic, False)
+
+    def set(self, week_key, topic, done):
+        with self._lock:
+            if self.get(week_key).get(topic) == done:
+                return
+            self._mark(week_key, topic, done)
+
+    def _mark(self, week_key, topic, done):
+        self._apply(week_key, topic, done)
+        self._dirty[(week_key, topic)] = done
+        if self.flush_delay is None:
+            return
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = threading.Timer(self.flush_delay, self.flush)
+        self._timer.daemon = True
+        self._timer.start()
+
+    @property
+    def dirty_count(self):
+        return len(self._dirty)
+
+    @traced("user_progress.flush")
+    def flush(self):
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return
+            lines = "".join(
+                json.dumps({"w": week_key, "t": topic, "d": done}) + "\n"
+                for (week_key, topic), done in self._dirty.items()
+            ).encode("utf-8")
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with file_lock(self.lock_path):
+                # Read what others saved for this user first so our offset stays in step
+                if file_signature(self.path) != self._signature:
+                    self._load_locked()
+                else:
+                    self._replay_journal()
+                with open(self.journal_path, "ab") as f:
+                    f.write(lines)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_offset += len(lines)
+                self._journal_entries += len(self._dirty)
+                self._dirty.clear()
+                self.flushes += 1
+                if self._journal_entries >= self.compact_every:
+                    self._compact_locked()
+
+    @traced("user_progress.compact")
+    def compact(self):
+        with self._lock:
+            self.flush()
+            if not os.path.exists(self.journal_path):
+                return
+            with file_lock(self.lock_path):
+                self._compact_locked()
+
+    def _compact_locked(self):
+        self._load_locked()
+        atomic_write_json(self._serialize(), self.path, indent=None)
+        open(self.journal_path, "w").close()
+        self._signature = file_signature(self.path)
+        self._journal_offset = 0
+        self._journal_entries = 0
+
+    def close(self):
+        self.flush()
+
+
+# 🚚 Move the legacy global progress.json into one user's shard
+def migrate_progress_json(legacy_path="progress.json", user=DEFAULT_USER, root=ROOT):
+    legacy = load_progress(legacy_path)
+    store = UserProgressStore(user, root, flush_delay=None)
+    migrated = 0
+    for week_key, week_topics in legacy.items():
+        for topic, done in week_topics.items():
+            store._mark(week_key, topic, bool(done))
+            migrated += 1
+    store.compact()
+    return migrated
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_user_progress_store(user=DEFAULT_USER, root=ROOT, legacy_path="progress.json"):
+    key = (root, user)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            path = user_shard_path(user, root)
+            # The first time the default user is opened, carry over the old shared file
+            if user == DEFAULT_USER and not os.path.exists(path) and os.path.exists(legacy_path):
+                migrate_progress_json(legacy_path, user, root)
+            store = UserProgressStore(user, root)
+            _stores[key] = store
+            atexit.register(store.close)
+        return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user progress storage tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    migrate = sub.add_parser("migrate", help="import a legacy progress.json into one user's shard")
+    migrate.add_argument("legacy", nargs="?", default="progress.json")
+    migrate.add_argument("--user", default=DEFAULT_USER)
+    migrate.add_argument("--root", default=ROOT)
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        count = migrate_progress_json(args.legacy, args.user, args.root)
+        print(f"🚚 migrated {count} topic entries for '{args.user}' into {user_shard_path(args.user, args.root)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,127 @@
 import json
 import os
+import tempfile
 
+from tracing import traced
+
+@traced()
 def load_skills(path):
     with open(path, "r") as f:
         return json.load(f)
 
+@traced()
 def load_progress(path):
     if not os.path.exists(path):
         with open(path, "w") as f:
             json.dump({}, f)
     with open(path, "r") as f:
-        return json.load(f)
+        data = json.load(f)
+    apply_progress_journal(data, path + ".journal")
+    return data
 
+@traced()
 def save_progress(data, path):
-    with open(path, "w") as f:
-        json.dump(data, f, indent=2)
+    atomic_write_json(data, path)
+
+# 💾 Write to a temp file in the same directory, then rename over the target
+def atomic_write_json(data, path, indent=2):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=".tmp-", dir=directory)
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f, indent=indent)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+# Changes whenever the file is replaced or rewritten; None while it does not exist
+def file_signature(path):
+    try:
+        st = os.stat(path)
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    except FileNotFoundError:
+        return None
+
+# 📜 (offset just past the line, entry) for each line of the append-only change log the
+# progress stores write; entry is None for a line that is not valid JSON
+def iter_progress_journal(journal_path, offset=0):
+    if not os.path.exists(journal_path):
+        return
+    with open(journal_path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            # A torn final line from a crashed writer is skipped, not fatal
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                entry = None
+            yield offset, entry
+
+# 📜 Replay the change log written by progress_store.ProgressStore
+def apply_progress_journal(data, journal_path, offset=0, index=None):
+    for offset, entry in iter_progress_journal(journal_path, offset):
+        if entry is None:
+            continue
+        week = data.setdefault(entry["w"], {})
+        if index is not None:
+            index.update(entry["w"], entry["t"], week.get(entry["t"]), entry["d"])
+        week[entry["t"]] = entry["d"]
+    return offset
+
+def split_week_key(week_key):
+    goal, sep, week = week_key.rpartition("_")
+    if sep and week.startswith("Week"):
+        return goal, week
+    return week_key, ""
+
+# 📊 Completed/total counters per goal, kept current in O(1) per toggle
+class ProgressIndex:
+    def __init__(self):
+        self.goals = {}
+
+    @classmethod
+    @traced("utils.ProgressIndex.from_progress")
+    def from_progress(cls, progress_data):
+        index = cls()
+        for week_key, week_topics in progress_data.items():
+            counts = index.goals.setdefault(split_week_key(week_key)[0], [0, 0])
+            counts[0] += sum(1 for done in week_topics.values() if done)
+            counts[1] += len(week_topics)
+        return index
+
+    def update(self, week_key, topic, old, new):
+        counts = self.goals.setdefault(split_week_key(week_key)[0], [0, 0])
+        if old is None:
+            counts[1] += 1
+            counts[0] += 1 if new else 0
+        elif bool(old) != bool(new):
+            counts[0] += 1 if new else -1
+
+    def percent(self, goal):
+        completed, total = self.goals.get(goal, (0, 0))
+        if total == 0:
+            return 0
+        return round((completed / total) * 100, 2)
+
+    def overall(self):
+        if not self.goals:
+            return 0
+        return sum(self.percent(goal) for goal in self.goals) / len(self.goals)
+
+    def goal_count(self):
+        return len(self.goals)
 
+@traced()
 def calculate_progress(progress_data, goal_prefix=""):
+    if isinstance(progress_data, ProgressIndex):
+        return progress_data.percent(goal_prefix)
     completed = 0
     total = 0
     for week_key, week_topics in progress_data.items():